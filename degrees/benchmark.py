@@ -0,0 +1,205 @@
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from bisect import bisect
+from itertools import accumulate
+
+import degrees
+from server import percentiles
+
+# (label, people, movies) generated when no --scales are given
+SCALES = (
+    ("1k", 1000, 800),
+    ("10k", 10000, 8000),
+    ("100k", 100000, 80000),
+)
+
+# How each load mode calls load_data, and which searches it is timed with
+MODES = {
+    "dicts": ({"compiled": False}, ("bfs", "bidirectional")),
+    "compiled": ({"compiled": True, "cache": False}, ("bfs", "bidirectional")),
+    "snapshot": ({"compiled": True}, ("bfs", "bidirectional")),
+    "landmarks": ({"compiled": True, "landmarks": 8}, ("astar",)),
+}
+
+
+def generate(directory, people, movies, seed=0, zipf=0.8):
+    """
+    Writes synthetic people.csv, movies.csv and stars.csv.
+
+    Casts are small (mostly 2-6, occasionally large ensembles) and
+    actors are picked with Zipf-like popularity, so a few people star
+    in many movies and most in one or two, as in the IMDb data.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    weights = list(accumulate(1 / (rank + 1) ** zipf for rank in range(people)))
+    total = weights[-1]
+    # Popularity should not follow id order
+    order = list(range(people))
+    rng.shuffle(order)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        f.write("id,name,birth\n")
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        for person in range(people):
+            writer.writerow([person, f"Person {person}", 1920 + rng.randrange(90)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        f.write("id,title,year\n")
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        for movie in range(movies):
+            writer.writerow([movie, f"Movie {movie}", 1930 + rng.randrange(90)])
+
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(movies):
+            cast = 2 + min(int(rng.expovariate(1 / 2.5)), 40)
+            stars = {order[bisect(weights, rng.random() * total)] for _ in range(cast)}
+            for person in stars:
+                writer.writerow([person, movie])
+
+
+def measure(directory, mode, queries, seed=0):
+    """
+    Loads `directory` in one mode and times searches between random
+    pairs. Meant to run in a fresh process so peak RSS is its own.
+    """
+    options, searches = MODES[mode]
+    started = time.perf_counter()
+    degrees.load_data(directory, **options)
+    load_seconds = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    person_ids = list(degrees.people)
+    pairs = [rng.sample(person_ids, 2) for _ in range(queries)]
+
+    # Count expansions on the dict path by wrapping its neighbor function
+    expansions = [0]
+    neighbors = degrees.neighbors_for_person
+
+    def counting_neighbors(person_id):
+        expansions[0] += 1
+        return neighbors(person_id)
+
+    if degrees.graph is None:
+        degrees.neighbors_for_person = counting_neighbors
+
+    functions = {
+        "bfs": degrees.shortest_path,
+        "bidirectional": degrees.bidirectional_shortest_path,
+        "astar": degrees.shortest_path,
+    }
+    results = {}
+    for search in searches:
+        latencies = []
+        expanded = 0
+        for source, target in pairs:
+            expansions[0] = 0
+            if degrees.graph is not None:
+                degrees.graph.expanded = 0
+            started = time.perf_counter()
+            functions[search](source, target)
+            latencies.append((time.perf_counter() - started) * 1000)
+            expanded += degrees.graph.expanded if degrees.graph is not None else expansions[0]
+        results[search] = {
+            "latency_ms": percentiles(latencies),
+            "mean_expanded": expanded / len(pairs),
+        }
+    degrees.neighbors_for_person = neighbors
+
+    return {
+        "mode": mode,
+        "load_seconds": load_seconds,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "searches": results,
+    }
+
+
+def run(workdir, scales, modes, queries, seed):
+    """Generates each scale and measures every mode in a subprocess."""
+    records = []
+    for label, people, movies in scales:
+        directory = os.path.join(workdir, label)
+        if not os.path.exists(os.path.join(directory, "stars.csv")):
+            print(f"Generating {label} ({people} people, {movies} movies)...", file=sys.stderr)
+            generate(directory, people, movies, seed)
+        for mode in modes:
+            if mode == "snapshot":
+                # Make sure the snapshot exists, so the timed run maps it
+                degrees.load_data(directory, compiled=True)
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", mode, directory,
+                 "--queries", str(queries), "--seed", str(seed)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            record = json.loads(output)
+            record.update({"scale": label, "people": people, "movies": movies})
+            records.append(record)
+            print(f"{label:>6} {mode:>10}: load {record['load_seconds']:.3f}s, "
+                  f"peak RSS {record['peak_rss_kb'] // 1024} MB", file=sys.stderr)
+    return records
+
+
+def compare(records, baseline):
+    """Prints the change in load time and p50 latency against a baseline run."""
+    previous = {(record["scale"], record["mode"]): record for record in baseline}
+    for record in records:
+        before = previous.get((record["scale"], record["mode"]))
+        if before is None:
+            continue
+        print(f"{record['scale']:>6} {record['mode']:>10}: load "
+              f"{record['load_seconds'] / before['load_seconds']:.2f}x")
+        for search, result in record["searches"].items():
+            old = before["searches"].get(search)
+            if old and old["latency_ms"]["p50"]:
+                print(f"{'':>17} {search}: p50 "
+                      f"{result['latency_ms']['p50'] / old['latency_ms']['p50']:.2f}x")
+
+
+def parse_scale(value):
+    label, people, movies = value.split(":")
+    return label, int(people), int(movies)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python benchmark.py [--workdir DIR] [--scales LABEL:PEOPLE:MOVIES ...] "
+              "[--output FILE] [--baseline FILE]"
+    )
+    parser.add_argument("--workdir", default="benchmark")
+    parser.add_argument("--scales", nargs="+", type=parse_scale, default=SCALES)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "DIRECTORY"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        mode, directory = args.measure
+        print(json.dumps(measure(directory, mode, args.queries, args.seed)))
+        return
+
+    records = run(args.workdir, args.scales, args.modes, args.queries, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(records, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
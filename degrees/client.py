@@ -0,0 +1,56 @@
+import argparse
+import http.client
+import json
+import sys
+from urllib.parse import urlencode
+
+
+class DegreesClient():
+    """Minimal blocking client for server.py over one keep-alive connection."""
+
+    def __init__(self, host="127.0.0.1", port=8050, timeout=30):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def get(self, path, **params):
+        """Returns (status, decoded JSON body) for a GET request."""
+        self.connection.request("GET", f"{path}?{urlencode(params)}")
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def shortest_path(self, source, target, k=1):
+        return self.get("/path", source=source, target=target, k=k)
+
+    def names(self, query, fuzzy=False, limit=10):
+        params = {"q": query, "limit": limit}
+        if fuzzy:
+            params["fuzzy"] = 1
+        return self.get("/names", **params)
+
+    def metrics(self):
+        return self.get("/metrics")
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python client.py source target [--k K] [--host HOST] [--port PORT]"
+    )
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--k", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    args = parser.parse_args()
+
+    client = DegreesClient(args.host, args.port)
+    status, body = client.shortest_path(args.source, args.target, args.k)
+    client.close()
+    print(json.dumps(body, indent=2))
+    if status != 200:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,198 @@
-import csv
+import argparse
+import itertools
+import json
 import sys
+import time
+from collections import Counter
 
+from graph import MoviesView, PeopleView
+from ingest import load_graph, read_rows
+from landmarks import LandmarkIndex
+from nameindex import NameIndex
+from snapshot import fingerprint, load_snapshot, write_snapshot
 from util import Node, StackFrontier, QueueFrontier
 
-# Maps names to a set of corresponding person_ids
+# Maps names to a set of corresponding person_ids (see get_names)
 names = {}
 
+# Prefix / fuzzy search over the same names, built by get_name_index
+name_index = None
+
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
 people = {}
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compiled co-star graph; when set, `people` and `movies` are views over it
+graph = None
+
+# Landmark distance index over `graph`, when load_data is asked for one
+landmark_index = None
+
+# Batch queries answered together, so results stream while input arrives
+BATCH_WINDOW = 1000
 
-def load_data(directory):
+
+def load_data(directory, compiled=False, cache=True, landmarks=0):
     """
     Load data from CSV files into memory.
+
+    If `compiled` is true, the CSVs are streamed straight into a `Graph`
+    and `people` / `movies` become read-only views backed by it. With
+    `cache`, the compiled graph is memory-mapped from a snapshot next
+    to the CSVs when one is up to date, and written there otherwise.
+    A positive `landmarks` also builds a LandmarkIndex of that many
+    people over the compiled graph.
+
+    Returns a Counter of skipped rows by reason.
     """
+    global graph, people, movies, landmark_index, name_index
+    # Start from nothing, so reloading never merges two data sets
+    graph, people, movies = None, {}, {}
+    names.clear()
+    landmark_index = None
+    name_index = None
+
+    if compiled or landmarks:
+        snapshot = None
+        if cache:
+            snapshot = load_snapshot(directory)
+            if snapshot is None:
+                # Fingerprint before parsing so edits made meanwhile invalidate it
+                sources = fingerprint(directory)
+        if snapshot is not None:
+            use_graph(snapshot)
+        else:
+            use_graph(load_graph(directory))
+            if cache:
+                try:
+                    write_snapshot(directory, graph, sources)
+                except OSError:
+                    pass
+        if landmarks:
+            landmark_index = LandmarkIndex.build(graph, landmarks)
+        return graph.rejected
+
+    # Rows are rejected by the same rules as load_graph: the first row
+    # with an id wins, and malformed rows are skipped
+    rejected = Counter()
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set(),
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    for person_id, name, birth in read_rows(
+        f"{directory}/people.csv", ("id", "name", "birth"), rejected
+    ):
+        if person_id in people:
+            rejected["people.csv: duplicate id"] += 1
+            continue
+        people[person_id] = {
+            "name": name,
+            "birth": birth,
+            "movies": set(),
+        }
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set(),
-            }
+    for movie_id, title, year in read_rows(
+        f"{directory}/movies.csv", ("id", "title", "year"), rejected
+    ):
+        if movie_id in movies:
+            rejected["movies.csv: duplicate id"] += 1
+            continue
+        movies[movie_id] = {
+            "title": title,
+            "year": year,
+            "stars": set(),
+        }
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    for person_id, movie_id in read_rows(
+        f"{directory}/stars.csv", ("person_id", "movie_id"), rejected
+    ):
+        if person_id not in people:
+            rejected["stars.csv: unknown person_id"] += 1
+        elif movie_id not in movies:
+            rejected["stars.csv: unknown movie_id"] += 1
+        else:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+
+    return rejected
+
+
+def use_graph(compiled_graph):
+    """
+    Makes `compiled_graph` the active data set: `people` and `movies`
+    become views over it. `names` and `name_index` are built from it
+    when first needed, so loading a snapshot stays cheap.
+    """
+    global graph, people, movies, name_index
+    graph = compiled_graph
+    people = PeopleView(graph)
+    movies = MoviesView(graph)
+    names.clear()
+    name_index = None
+
+
+def get_names():
+    """Returns `names`, filling it from the compiled graph on first use."""
+    if graph is not None and not names:
+        for person_id, name in zip(graph.person_ids, graph.person_names):
+            names.setdefault(name.lower(), set()).add(person_id)
+    return names
+
+
+def get_name_index():
+    """Returns the NameIndex over the loaded people, building it on first use."""
+    global name_index
+    if name_index is None:
+        if graph is not None:
+            name_index = NameIndex.from_graph(graph)
+        else:
+            name_index = NameIndex.from_people(people)
+    return name_index
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        usage="python degrees.py [directory] [--compiled] [--no-cache] "
+              "[--landmarks K] [--batch FILE [--window N]]"
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compiled", action="store_true",
+                        help="search a compact integer-indexed graph")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="don't read or write the binary snapshot")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="build a K-landmark distance index and find "
+                             "single shortest paths with A* search")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer source/target pairs from FILE ('-' for stdin) as JSONL")
+    parser.add_argument("--window", type=int, default=BATCH_WINDOW, metavar="N",
+                        help="in batch mode, answer queries every N lines")
+    args = parser.parse_args()
+
+    if args.batch:
+        print("Loading data...", file=sys.stderr)
+        rejected = load_data(args.directory, compiled=True, cache=args.cache,
+                             landmarks=args.landmarks)
+        report_rejected(rejected, sys.stderr)
+        print("Data loaded.", file=sys.stderr)
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.window)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, args.window)
+        return
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    rejected = load_data(args.directory, compiled=args.compiled, cache=args.cache,
+                         landmarks=args.landmarks)
+    report_rejected(rejected, sys.stdout)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +202,10 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if landmark_index is not None:
+        path = shortest_path(source, target)
+    else:
+        path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -91,6 +227,14 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    if landmark_index is not None:
+        return graph.path_ids(landmark_index.shortest_path(
+            graph, graph.person_index[source], graph.person_index[target]
+        ))
+    if graph is not None:
+        return graph.path_ids(graph.shortest_path(
+            graph.person_index[source], graph.person_index[target]
+        ))
 
     # TODO
     start = Node(state=source, parent=None, action=None)
@@ -129,12 +273,290 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
-def person_id_for_name(name):
+def report_rejected(rejected, out):
+    for reason, count in sorted(rejected.items()):
+        print(f"Skipped {count} rows ({reason})", file=out)
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two person_ids from the landmark index, without searching.
+    """
+    if landmark_index is None:
+        raise Exception("no landmark index loaded")
+    return landmark_index.bounds(
+        graph.person_index[source], graph.person_index[target]
+    )
+
+
+def run_batch(lines, out, window=BATCH_WINDOW):
+    """
+    Answers many queries against the compiled graph.
+
+    Each input line is either a JSON object with "source" and "target"
+    or the two separated by a tab; each may be a person_id or a unique
+    name. One JSON object per query is written to `out`. Queries are
+    answered in windows of `window` queries, so results stream while
+    input is still arriving; within a window they are grouped by source
+    (see answer_queries).
+    """
+    queries = {}
+    pending = 0
+    results = 0
+    started = time.perf_counter()
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if line.startswith("{"):
+                query = json.loads(line)
+                source, target = query["source"], query["target"]
+                # IMDB ids are numeric, so JSON clients may send them as numbers
+                source, target = [
+                    str(value) if type(value) is int else value
+                    for value in (source, target)
+                ]
+                if not isinstance(source, str) or not isinstance(target, str):
+                    raise ValueError("source and target must be strings")
+            else:
+                source, target = line.split("\t")
+        except (ValueError, KeyError):
+            write_result(out, {"line": number, "error": "malformed query"})
+            results += 1
+            continue
+
+        source_id = resolve_person(source)
+        target_id = resolve_person(target)
+        if source_id is None or target_id is None:
+            write_result(out, {
+                "line": number, "source": source, "target": target,
+                "error": "person not found",
+            })
+            results += 1
+            continue
+        queries.setdefault(source_id, []).append((number, target_id))
+        pending += 1
+        if pending >= window:
+            results += answer_queries(queries, out)
+            queries = {}
+            pending = 0
+
+    results += answer_queries(queries, out)
+
+    elapsed = time.perf_counter() - started
+    rate = results / elapsed if elapsed else float("inf")
+    print(f"{results} queries in {elapsed:.3f}s ({rate:.1f} queries/sec)", file=sys.stderr)
+
+
+def answer_queries(queries, out):
+    """
+    Writes the path for every query in `queries`, which maps a source
+    person_id to its (line, target person_id) pairs. A single BFS tree
+    answers all targets of a source; with a landmark index, a source
+    with only one target uses A* instead. Returns the number of results.
+    """
+    results = 0
+    for source_id, targets in queries.items():
+        if landmark_index is not None and len(targets) == 1:
+            paths = [shortest_path(source_id, target_id) for _, target_id in targets]
+        else:
+            source = graph.person_index[source_id]
+            tree = graph.bfs_tree(
+                source, [graph.person_index[target_id] for _, target_id in targets]
+            )
+            paths = [
+                graph.path_ids(graph.tree_path(tree, source, graph.person_index[target_id]))
+                for _, target_id in targets
+            ]
+        for (number, target_id), path in zip(targets, paths):
+            write_result(out, {
+                "line": number, "source": source_id, "target": target_id,
+                "degrees": None if path is None else len(path),
+                "path": path,
+            })
+            results += 1
+    return results
+
+
+def write_result(out, result):
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+def resolve_person(value):
+    """
+    Returns the person_id for a batch query value, which may be an id
+    or a name resolved non-interactively. Returns None otherwise.
+    """
+    if value in people:
+        return value
+    return person_id_for_name(value, interactive=False)
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both
+    ends at once and always expanding the smaller frontier.
+
+    If no possible path, returns None.
+    """
+    if graph is not None:
+        return graph.path_ids(graph.bidirectional_path(
+            graph.person_index[source], graph.person_index[target]
+        ))
+
+    if source == target:
+        return []
+
+    # Cada lado mapeia person_id -> (movie_id, vizinho, profundidade)
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        # Expandir sempre a fronteira menor
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward, backward
+            )
+            if meeting is not None:
+                person_id, movie_id, other_id = meeting
+                return join_paths(forward, backward, person_id, movie_id, other_id)
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward, forward
+            )
+            if meeting is not None:
+                person_id, movie_id, other_id = meeting
+                return join_paths(forward, backward, other_id, movie_id, person_id)
+
+    return None
+
+
+def expand_layer(frontier, visited, other):
+    """
+    Expands every person in one BFS layer, recording parents in `visited`.
+
+    Returns the next layer and the best (person_id, movie_id, other_id)
+    edge that reaches a person already visited from the other side,
+    or None if the two searches have not met yet.
+    """
+    layer = []
+    meeting = None
+    best = None
+    for person_id in frontier:
+        depth = visited[person_id][2]
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in other:
+                # Toda a camada é examinada para garantir o menor caminho
+                length = depth + 1 + other[neighbor_id][2]
+                if best is None or length < best:
+                    best = length
+                    meeting = (person_id, movie_id, neighbor_id)
+            if neighbor_id not in visited:
+                visited[neighbor_id] = (movie_id, person_id, depth + 1)
+                layer.append(neighbor_id)
+    return layer, meeting
+
+
+def join_paths(forward, backward, person_id, movie_id, other_id):
+    """
+    Builds the (movie_id, person_id) path through the edge where the
+    forward search (ending at `person_id`) met the backward search
+    (ending at `other_id`).
+    """
+    solution = []
+    while forward[person_id][1] is not None:
+        movie, parent, _ = forward[person_id]
+        solution.append((movie, person_id))
+        person_id = parent
+    solution.reverse()
+
+    solution.append((movie_id, other_id))
+    while backward[other_id][1] is not None:
+        movie, child, _ = backward[other_id]
+        solution.append((movie, child))
+        other_id = child
+    return solution
+
+
+def all_shortest_paths(source, target):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    that connects the source to the target.
+
+    A BFS from the source records, for each person, every (movie_id,
+    parent) pair one layer closer, stopping once the target's layer is
+    complete. Paths are then unwound from the target on demand, so the
+    caller can stop early without materializing them all.
+    """
+    if source == target:
+        yield []
+        return
+
+    # Cada pessoa guarda todos os pais da camada anterior
+    parents = {source: []}
+    layer = [source]
+    while layer and target not in parents:
+        next_layer = {}
+        for person_id in layer:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in next_layer:
+                    next_layer[neighbor_id].append((movie_id, person_id))
+                elif neighbor_id not in parents:
+                    next_layer[neighbor_id] = [(movie_id, person_id)]
+        parents.update(next_layer)
+        layer = list(next_layer)
+
+    if target not in parents:
+        return
+
+    # Busca em profundidade do alvo até a origem, com pilha explícita
+    path = []
+    stack = [iter(parents[target])]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        movie_id, parent_id = step
+        child_id = path[-1][2] if path else target
+        path.append((movie_id, child_id, parent_id))
+        if parent_id == source:
+            yield [(movie_id, person_id) for movie_id, person_id, _ in reversed(path)]
+            path.pop()
+        else:
+            stack.append(iter(parents[parent_id]))
+
+
+def shortest_paths(source, target, k=None):
+    """
+    Returns up to `k` (or all, if `k` is None) shortest lists of
+    (movie_id, person_id) pairs connecting the source to the target.
+    """
+    return list(itertools.islice(all_shortest_paths(source, target), k))
+
+
+def person_id_for_name(name, interactive=True, birth=None):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If `interactive` is false, the name index resolves it instead of
+    prompting: close misspellings are accepted, a `birth` year hint is
+    honoured and otherwise the person with most movies wins.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    if not interactive:
+        return get_name_index().resolve(name, birth)
+
+    person_ids = list(get_names().get(name.lower(), set()))
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -160,6 +582,12 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in graph.neighbors(graph.person_index[person_id])
+        }
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
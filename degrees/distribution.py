@@ -0,0 +1,111 @@
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+import degrees
+from snapshot import read_snapshot, snapshot_path
+
+# Graph opened by each worker process
+worker_graph = None
+
+
+def open_snapshot(path):
+    """
+    Pool initializer: memory-maps the snapshot, so every worker shares
+    the same read-only pages instead of holding its own copy. Workers
+    only search the CSR arrays, so the names and ID maps are never built.
+    """
+    global worker_graph
+    worker_graph, _ = read_snapshot(path)
+
+
+def degree_histogram(graph, source):
+    """
+    Returns a Counter mapping degrees of separation to the number of
+    people at that distance from `source`. Unreachable people are
+    counted under -1; `source` itself is not counted.
+    """
+    distance, _, _ = graph.bfs_tree(source)
+    histogram = Counter(distance)
+    histogram[0] -= 1
+    if not histogram[0]:
+        del histogram[0]
+    return histogram
+
+
+def worker_histogram(source):
+    return degree_histogram(worker_graph, source)
+
+
+def distribution(directory, sources, workers=None, chunksize=4, graph=None):
+    """
+    Computes the merged degree histogram from every person_id in
+    `sources` to everyone else, fanning the searches out over a
+    process pool that shares the graph through its snapshot.
+
+    `graph` is the graph already loaded from `directory`, if any.
+    """
+    if graph is None:
+        degrees.load_data(directory, compiled=True)
+        graph = degrees.graph
+    indices = [graph.person_index[source] for source in sources]
+
+    total = Counter()
+    path = snapshot_path(directory)
+    # Without a snapshot to share (e.g. a read-only directory), stay in-process
+    if workers == 1 or not os.path.exists(path):
+        for source in indices:
+            total.update(degree_histogram(graph, source))
+        return total
+
+    with Pool(workers, initializer=open_snapshot,
+              initargs=(path,)) as pool:
+        for histogram in pool.imap_unordered(worker_histogram, indices, chunksize):
+            total.update(histogram)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python distribution.py directory [--sources FILE | --sample N] [--workers N]"
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--sources", metavar="FILE",
+                        help="file with one source person_id per line")
+    parser.add_argument("--sample", type=int, default=100,
+                        help="number of random sources if --sources is not given")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory, compiled=True)
+    if args.sources:
+        with open(args.sources, encoding="utf-8") as f:
+            sources = [line.strip() for line in f if line.strip()]
+    else:
+        population = degrees.graph.person_ids
+        sources = random.Random(args.seed).sample(
+            population, min(args.sample, len(population))
+        )
+
+    started = time.perf_counter()
+    try:
+        histogram = distribution(args.directory, sources, args.workers,
+                                 graph=degrees.graph)
+    except KeyError as e:
+        sys.exit(f"Person not found: {e.args[0]}")
+    elapsed = time.perf_counter() - started
+
+    for distance in sorted(histogram):
+        label = "unreachable" if distance == -1 else f"{distance} degrees"
+        print(f"{label}: {histogram[distance]}")
+    print(f"{len(sources)} sources in {elapsed:.2f}s "
+          f"({len(sources) / elapsed:.1f} sources/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+from array import array
+from collections import Counter, deque
+from collections.abc import Mapping
+from functools import cached_property
+
+
+class Graph():
+    """
+    Compact co-star graph.
+
+    People and movies are interned to dense ints (their position in
+    `person_ids` / `movie_ids`). Adjacency is stored in CSR form: the
+    movies of person `p` are `person_movies[person_offsets[p]:person_offsets[p + 1]]`
+    and the stars of movie `m` are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        # Input rows skipped while building the graph, by reason
+        self.rejected = Counter()
+        # People expanded by searches so far, for benchmarking
+        self.expanded = 0
+
+    @cached_property
+    def person_index(self):
+        """Maps person_ids to person indices, built on first use."""
+        return {person_id: i for i, person_id in enumerate(self.person_ids)}
+
+    @cached_property
+    def movie_index(self):
+        """Maps movie_ids to movie indices, built on first use."""
+        return {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+
+    @property
+    def person_count(self):
+        return len(self.person_ids)
+
+    @property
+    def movie_count(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """Returns the movie indices a person starred in."""
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """Returns the person indices who starred in a movie."""
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """Yields (movie, person) index pairs for everyone who starred with `person`."""
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def shortest_path(self, source, target):
+        """
+        Breadth-first search over person indices.
+
+        Returns the list of (movie, person) index pairs from `source`
+        to `target`, or None if they are not connected.
+        """
+        if source == target:
+            return []
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        parent_person = array("i", [-1]) * self.person_count
+        parent_movie = array("i", [-1]) * self.person_count
+        # A movie's cast only has to be scanned once per search
+        seen_movie = bytearray(self.movie_count)
+        parent_person[source] = source
+
+        queue = deque([source])
+        while queue:
+            person = queue.popleft()
+            self.expanded += 1
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if seen_movie[movie]:
+                    continue
+                seen_movie[movie] = 1
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_people[j]
+                    if parent_person[star] == -1:
+                        parent_person[star] = person
+                        parent_movie[star] = movie
+                        if star == target:
+                            return self._trace(parent_person, parent_movie, source, target)
+                        queue.append(star)
+        return None
+
+    def bfs_tree(self, source, targets=None):
+        """
+        Breadth-first search from `source`, returning its (distance,
+        parent_person, parent_movie) arrays. Unreached people have
+        distance and parent -1.
+
+        If `targets` is given, the search stops once all of them are reached.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        distance = array("i", [-1]) * self.person_count
+        parent_person = array("i", [-1]) * self.person_count
+        parent_movie = array("i", [-1]) * self.person_count
+        seen_movie = bytearray(self.movie_count)
+        distance[source] = 0
+        parent_person[source] = source
+
+        remaining = None
+        if targets is not None:
+            remaining = set(targets)
+            remaining.discard(source)
+
+        queue = deque([source])
+        while queue and remaining != set():
+            person = queue.popleft()
+            self.expanded += 1
+            next_distance = distance[person] + 1
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if seen_movie[movie]:
+                    continue
+                seen_movie[movie] = 1
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_people[j]
+                    if parent_person[star] == -1:
+                        distance[star] = next_distance
+                        parent_person[star] = person
+                        parent_movie[star] = movie
+                        queue.append(star)
+                        if remaining:
+                            remaining.discard(star)
+        return distance, parent_person, parent_movie
+
+    def tree_path(self, tree, source, target):
+        """Returns the path to `target` in a bfs_tree, or None if unreached."""
+        _, parent_person, parent_movie = tree
+        if parent_person[target] == -1:
+            return None
+        return self._trace(parent_person, parent_movie, source, target)
+
+    def bidirectional_path(self, source, target):
+        """
+        Same result as shortest_path, but searches from both ends and
+        always expands the smaller frontier one full layer at a time.
+        """
+        if source == target:
+            return []
+
+        count = self.person_count
+        # depth[p] > 0 on the side that reached p; 0 means unvisited
+        forward = (array("i", [-1]) * count, array("i", [-1]) * count, array("i", [0]) * count)
+        backward = (array("i", [-1]) * count, array("i", [-1]) * count, array("i", [0]) * count)
+        forward[0][source] = source
+        forward[2][source] = 1
+        backward[0][target] = target
+        backward[2][target] = 1
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = self._expand_layer(forward_frontier, forward, backward)
+                if meeting is not None:
+                    person, movie, other = meeting
+                    break
+            else:
+                backward_frontier, meeting = self._expand_layer(backward_frontier, backward, forward)
+                if meeting is not None:
+                    other, movie, person = meeting
+                    break
+        else:
+            return None
+
+        path = self._trace(forward[0], forward[1], source, person)
+        path.append((movie, other))
+        while other != target:
+            path.append((backward[1][other], backward[0][other]))
+            other = backward[0][other]
+        return path
+
+    def _expand_layer(self, frontier, visited, other):
+        """
+        Expands one BFS layer. Returns the next layer and the best
+        (person, movie, other_person) edge into the opposite search.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        parent_person, parent_movie, depth = visited
+        other_depth = other[2]
+
+        layer = []
+        meeting = None
+        best = None
+        self.expanded += len(frontier)
+        for person in frontier:
+            next_depth = depth[person] + 1
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_people[j]
+                    if other_depth[star] and (best is None or next_depth + other_depth[star] < best):
+                        best = next_depth + other_depth[star]
+                        meeting = (person, movie, star)
+                    if not depth[star]:
+                        depth[star] = next_depth
+                        parent_person[star] = person
+                        parent_movie[star] = movie
+                        layer.append(star)
+        return layer, meeting
+
+    def _trace(self, parent_person, parent_movie, source, person):
+        """Follows parent arrays back from `person` to `source`."""
+        path = []
+        while person != source:
+            path.append((parent_movie[person], person))
+            person = parent_person[person]
+        path.reverse()
+        return path
+
+    def path_ids(self, path):
+        """Translates a path of index pairs into (movie_id, person_id) pairs."""
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person]) for movie, person in path]
+
+
+class PeopleView(Mapping):
+    """Read-only `people` dict backed by a Graph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie] for movie in graph.movies_of(person)},
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return self.graph.person_count
+
+
+class MoviesView(Mapping):
+    """Read-only `movies` dict backed by a Graph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person] for person in graph.stars_of(movie)},
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return self.graph.movie_count
@@ -0,0 +1,127 @@
+import csv
+import os
+from array import array
+from collections import Counter
+
+from graph import Graph
+
+
+def read_rows(path, columns, rejected):
+    """
+    Streams the requested columns of a CSV file as tuples.
+
+    Rows missing a column are counted in `rejected` and skipped.
+    """
+    name = os.path.basename(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        indices = [header.index(column) for column in columns]
+        width = max(indices) + 1
+        for row in reader:
+            if len(row) < width:
+                if row:
+                    rejected[f"{name}: malformed row"] += 1
+                continue
+            yield tuple(row[i] for i in indices)
+
+
+def build_csr(sources, targets, count):
+    """
+    Groups the edge list `sources[i] -> targets[i]` by source into CSR
+    (offsets, indices) arrays, with each row sorted and deduplicated.
+    """
+    offsets = array("q", [0]) * (count + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    indices = array("i", [0]) * len(sources)
+    cursor = array("q", offsets[:-1])
+    for source, target in zip(sources, targets):
+        indices[cursor[source]] = target
+        cursor[source] += 1
+    del cursor
+
+    # Sort each row and drop repeated edges, compacting in place
+    write = 0
+    start = 0
+    for i in range(count):
+        end = offsets[i + 1]
+        row = sorted(set(indices[start:end]))
+        indices[write:write + len(row)] = array("i", row)
+        offsets[i] = write
+        write += len(row)
+        start = end
+    offsets[count] = write
+    del indices[write:]
+    return offsets, indices
+
+
+def load_graph(directory):
+    """
+    Builds a Graph straight from people.csv, movies.csv and stars.csv.
+
+    Rows are streamed and IDs interned as they are read; stars.csv only
+    contributes two int arrays before being grouped into CSR form, so
+    peak memory stays close to the size of the final graph. Rejected
+    rows are counted by reason in the graph's `rejected` Counter.
+    """
+    rejected = Counter()
+
+    person_index = {}
+    person_ids, person_names, person_births = [], [], []
+    for person_id, name, birth in read_rows(
+        f"{directory}/people.csv", ("id", "name", "birth"), rejected
+    ):
+        if person_id in person_index:
+            rejected["people.csv: duplicate id"] += 1
+            continue
+        person_index[person_id] = len(person_ids)
+        person_ids.append(person_id)
+        person_names.append(name)
+        person_births.append(birth)
+
+    movie_index = {}
+    movie_ids, movie_titles, movie_years = [], [], []
+    for movie_id, title, year in read_rows(
+        f"{directory}/movies.csv", ("id", "title", "year"), rejected
+    ):
+        if movie_id in movie_index:
+            rejected["movies.csv: duplicate id"] += 1
+            continue
+        movie_index[movie_id] = len(movie_ids)
+        movie_ids.append(movie_id)
+        movie_titles.append(title)
+        movie_years.append(year)
+
+    edge_people = array("i")
+    edge_movies = array("i")
+    for person_id, movie_id in read_rows(
+        f"{directory}/stars.csv", ("person_id", "movie_id"), rejected
+    ):
+        person = person_index.get(person_id)
+        movie = movie_index.get(movie_id)
+        if person is None:
+            rejected["stars.csv: unknown person_id"] += 1
+        elif movie is None:
+            rejected["stars.csv: unknown movie_id"] += 1
+        else:
+            edge_people.append(person)
+            edge_movies.append(movie)
+
+    person_offsets, person_movies = build_csr(edge_people, edge_movies, len(person_ids))
+    movie_offsets, movie_people = build_csr(edge_movies, edge_people, len(movie_ids))
+    del edge_people, edge_movies
+
+    graph = Graph(
+        person_ids, person_names, person_births,
+        movie_ids, movie_titles, movie_years,
+        person_offsets, person_movies, movie_offsets, movie_people,
+    )
+    graph.rejected = rejected
+    # Hand over the ID maps instead of letting the graph rebuild them
+    graph.person_index = person_index
+    graph.movie_index = movie_index
+    return graph
@@ -0,0 +1,128 @@
+import heapq
+import math
+from array import array
+
+# Distances are stored one byte per person; this marks "not reachable"
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+    """
+    Exact BFS distances from a few well-connected landmark people to
+    everyone else. By the triangle inequality, for any landmark L:
+
+        |d(L, a) - d(L, b)| <= d(a, b) <= d(L, a) + d(L, b)
+
+    so the index bounds any separation in O(K) without searching.
+    """
+
+    def __init__(self, landmarks, distances):
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """Runs one BFS from each of the `count` highest-degree people."""
+        degree = array("q", [0]) * graph.person_count
+        for movie in range(graph.movie_count):
+            stars = graph.stars_of(movie)
+            for person in stars:
+                degree[person] += len(stars) - 1
+        landmarks = sorted(
+            range(graph.person_count), key=degree.__getitem__, reverse=True
+        )[:count]
+
+        distances = []
+        for landmark in landmarks:
+            distance, _, _ = graph.bfs_tree(landmark)
+            distances.append(array("B", (
+                UNREACHABLE if d < 0 else min(d, UNREACHABLE - 1) for d in distance
+            )))
+        return cls(landmarks, distances)
+
+    def bounds(self, a, b):
+        """
+        Returns (lower, upper) bounds on the separation of people `a`
+        and `b`. Both are math.inf if the index proves them disconnected;
+        upper is math.inf if no landmark reaches them.
+        """
+        lower = 0
+        upper = math.inf
+        for distance in self.distances:
+            da = distance[a]
+            db = distance[b]
+            if (da == UNREACHABLE) != (db == UNREACHABLE):
+                return math.inf, math.inf
+            if da != UNREACHABLE:
+                lower = max(lower, abs(da - db))
+                upper = min(upper, da + db)
+        if a == b:
+            upper = 0
+        return lower, upper
+
+    def lower_bound(self, a, b):
+        return self.bounds(a, b)[0]
+
+    def shortest_path(self, graph, source, target):
+        """
+        A* search over person indices, guided by the landmark lower bound
+        to `target`. Returns (movie, person) index pairs like
+        Graph.shortest_path, or None if they are not connected.
+        """
+        if source == target:
+            return []
+
+        # The lower bound is consistent, so a popped person is final
+        targets = [distance[target] for distance in self.distances]
+        pairs = list(zip(self.distances, targets))
+
+        def heuristic(person):
+            h = 0
+            for distance, dt in pairs:
+                dp = distance[person]
+                if (dp == UNREACHABLE) != (dt == UNREACHABLE):
+                    return math.inf
+                if dp != UNREACHABLE and abs(dp - dt) > h:
+                    h = abs(dp - dt)
+            return h
+
+        if heuristic(source) == math.inf:
+            return None
+
+        person_offsets = graph.person_offsets
+        person_movies = graph.person_movies
+        movie_offsets = graph.movie_offsets
+        movie_people = graph.movie_people
+
+        cost = array("i", [-1]) * graph.person_count
+        parent_person = array("i", [-1]) * graph.person_count
+        parent_movie = array("i", [-1]) * graph.person_count
+        closed = bytearray(graph.person_count)
+        cost[source] = 0
+        parent_person[source] = source
+
+        # Ties on f prefer the deeper node, which reaches the target sooner
+        heap = [(heuristic(source), 0, source)]
+        while heap:
+            _, negative_cost, person = heapq.heappop(heap)
+            if closed[person]:
+                continue
+            if person == target:
+                return graph._trace(parent_person, parent_movie, source, target)
+            closed[person] = 1
+            graph.expanded += 1
+            next_cost = 1 - negative_cost
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_people[j]
+                    if closed[star] or (cost[star] != -1 and cost[star] <= next_cost):
+                        continue
+                    h = heuristic(star)
+                    if h == math.inf:
+                        continue
+                    cost[star] = next_cost
+                    parent_person[star] = person
+                    parent_movie[star] = movie
+                    heapq.heappush(heap, (next_cost + h, -next_cost, star))
+        return None
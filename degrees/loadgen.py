@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlencode
+
+from server import percentiles
+from snapshot import read_snapshot, snapshot_path
+
+
+async def fetch(reader, writer, path, params):
+    """Sends one GET over an open connection; returns (status, latency)."""
+    started = time.perf_counter()
+    writer.write(
+        f"GET {path}?{urlencode(params)} HTTP/1.1\r\nHost: degrees\r\n\r\n".encode("latin-1")
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status, time.perf_counter() - started
+
+
+async def run(host, port, queries, concurrency):
+    """Replays `queries` over `concurrency` connections; returns results."""
+    pending = iter(queries)
+    results = []
+
+    async def connection():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for params in pending:
+                results.append(await fetch(reader, writer, "/path", params))
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python loadgen.py directory [--requests N] [--concurrency C] [--repeat R]"
+    )
+    parser.add_argument("directory", help="data directory the server was started with")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=float, default=0.2,
+                        help="fraction of requests that repeat an earlier pair")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The server writes the snapshot on startup; reuse it to pick ids
+    graph, _ = read_snapshot(snapshot_path(args.directory))
+    rng = random.Random(args.seed)
+    queries = []
+    for _ in range(args.requests):
+        if queries and rng.random() < args.repeat:
+            queries.append(rng.choice(queries))
+        else:
+            source, target = rng.sample(graph.person_ids, 2)
+            queries.append({"source": source, "target": target})
+
+    started = time.perf_counter()
+    results = asyncio.run(run(args.host, args.port, queries, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency * 1000 for _, latency in results]
+    print(json.dumps({
+        "requests": len(results),
+        "errors": sum(status != 200 for status, _ in results),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(results) / elapsed, 1),
+        "latency_ms": percentiles(latencies),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+
+def trigrams(name):
+    """Returns the set of padded trigrams of a lowercase name."""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, bound):
+    """
+    Levenshtein distance between `a` and `b`, or `bound + 1` as soon as
+    it is known to exceed `bound`. Only the diagonal band of width
+    2 * bound + 1 is computed.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    over = bound + 1
+    previous = [j if j <= bound else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low = max(1, i - bound)
+        high = min(len(b), i + bound)
+        current = [over] * (len(b) + 1)
+        if i <= bound:
+            current[0] = i
+        ca = a[i - 1]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost < over else over
+        if min(current[low - 1:high + 1]) > bound:
+            return over
+        previous = current
+    return previous[-1]
+
+
+class NameIndex():
+    """
+    Lookup structure over people's names.
+
+    Distinct lowercase names are kept in a sorted list for exact and
+    prefix search with bisect, plus a trigram index for bounded
+    edit-distance search.
+    """
+
+    def __init__(self, entries):
+        """
+        `entries` is an iterable of (person_id, name, birth, movie_count).
+        """
+        people = {}
+        self.details = {}
+        for person_id, name, birth, movie_count in entries:
+            people.setdefault(name.lower(), []).append(person_id)
+            self.details[person_id] = (name, birth, movie_count)
+
+        self.keys = sorted(people)
+        self.people = [people[key] for key in self.keys]
+
+        postings = {}
+        lengths = {}
+        for i, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, array("i")).append(i)
+            lengths.setdefault(len(key), array("i")).append(i)
+        self.postings = postings
+        self.lengths = lengths
+
+    @classmethod
+    def from_graph(cls, graph):
+        offsets = graph.person_offsets
+        return cls(
+            (person_id, graph.person_names[i], graph.person_births[i],
+             offsets[i + 1] - offsets[i])
+            for i, person_id in enumerate(graph.person_ids)
+        )
+
+    @classmethod
+    def from_people(cls, people):
+        return cls(
+            (person_id, person["name"], person["birth"], len(person["movies"]))
+            for person_id, person in people.items()
+        )
+
+    def exact(self, name):
+        """Returns the person_ids whose name matches exactly (ignoring case)."""
+        key = name.lower()
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return list(self.people[i])
+        return []
+
+    def prefix(self, prefix, limit=10):
+        """Returns up to `limit` (name, person_ids) pairs starting with `prefix`."""
+        prefix = prefix.lower()
+        results = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(results) < limit and self.keys[i].startswith(prefix):
+            results.append((self.keys[i], list(self.people[i])))
+            i += 1
+        return results
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to `limit` (distance, name, person_ids) tuples for names
+        within `max_distance` edits of `name`, closest first.
+        """
+        key = name.lower()
+        grams = sorted(trigrams(key), key=lambda gram: len(self.postings.get(gram, ())))
+        # An edit touches at most 3 trigrams, so a match misses at most 3k
+        # of the query's; of the `rarest` ones it must share `rarest - 3k`
+        lost = 3 * max_distance
+        if len(grams) > lost:
+            rarest = min(len(grams), lost + 3)
+            counts = Counter()
+            for gram in grams[:rarest]:
+                counts.update(self.postings.get(gram, ()))
+            candidates = [i for i, count in counts.items() if count >= rarest - lost]
+        else:
+            candidates = set()
+            # Too short for the filter to hold; fall back to the length window
+            for length in range(len(key) - max_distance, len(key) + max_distance + 1):
+                candidates.update(self.lengths.get(length, ()))
+
+        matches = []
+        for i in candidates:
+            distance = edit_distance(key, self.keys[i], max_distance)
+            if distance <= max_distance:
+                matches.append((distance, self.keys[i], list(self.people[i])))
+        matches.sort()
+        return matches[:limit]
+
+    def resolve(self, name, birth=None, max_distance=2):
+        """
+        Non-interactive disambiguation: returns a single person_id for
+        `name`, or None.
+
+        Exact matches win over fuzzy ones (closest distance first). Among
+        the candidates, a `birth` year hint narrows the choice when it
+        matches anyone, and ties go to whoever starred in most movies.
+        """
+        person_ids = self.exact(name)
+        if not person_ids:
+            matches = self.fuzzy(name, max_distance)
+            if not matches:
+                return None
+            closest = matches[0][0]
+            person_ids = [
+                person_id
+                for distance, _, ids in matches if distance == closest
+                for person_id in ids
+            ]
+        if birth is not None:
+            born = [person_id for person_id in person_ids
+                    if self.details[person_id][1] == str(birth)]
+            if born:
+                person_ids = born
+        return max(person_ids, key=lambda person_id: self.details[person_id][2])
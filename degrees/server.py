@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+from snapshot import load_snapshot
+
+# Latencies kept per endpoint for the /metrics percentiles
+LATENCY_WINDOW = 10000
+
+# Most shortest paths returned for one /path request
+MAX_PATHS = 100
+
+# Most matches returned for one /names request
+MAX_MATCHES = 100
+
+# Paths with their own /metrics entry; any other path is counted as "other"
+ROUTES = ("/path", "/names", "/metrics")
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """Returns {"p50": ..., ...} for a list of numbers (nearest rank)."""
+    if not values:
+        return {f"p{point}": None for point in points}
+    ordered = sorted(values)
+    return {
+        f"p{point}": ordered[min(len(ordered) - 1, len(ordered) * point // 100)]
+        for point in points
+    }
+
+
+def load_worker(directory, landmark_index):
+    """
+    Pool initializer: each worker maps the same graph snapshot and uses
+    the landmark index built once by the server, if any. Names are
+    resolved by the server process, so workers only need the graph.
+    """
+    graph = load_snapshot(directory)
+    if graph is None:
+        # No usable snapshot (e.g. a read-only directory): compile it here
+        degrees.load_data(directory, compiled=True, cache=False)
+    else:
+        degrees.graph = graph
+    degrees.landmark_index = landmark_index
+
+
+def search_paths(source, target, k):
+    """Runs in a worker process; returns up to `k` shortest paths."""
+    if k == 1:
+        if degrees.landmark_index is not None:
+            path = degrees.shortest_path(source, target)
+        else:
+            path = degrees.bidirectional_shortest_path(source, target)
+        return [] if path is None else [path]
+    return degrees.shortest_paths(source, target, k)
+
+
+class LRUCache():
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+
+class DegreesServer():
+    """
+    HTTP server answering degrees queries from a graph loaded once.
+
+    GET /path?source=..&target=..[&k=..]   up to k (<= MAX_PATHS) shortest paths; ids or names
+    GET /names?q=..[&fuzzy=1][&limit=..]   up to limit (<= MAX_MATCHES) name matches
+    GET /metrics                           request counts, latency, cache
+    """
+
+    def __init__(self, directory, workers=None, cache_size=1024, landmarks=0):
+        degrees.load_data(directory, compiled=True, landmarks=landmarks)
+        # Names are resolved on the event loop; build the index before serving
+        degrees.get_name_index()
+        self.pool = ProcessPoolExecutor(
+            workers, initializer=load_worker,
+            initargs=(directory, degrees.landmark_index)
+        )
+        self.cache = LRUCache(cache_size)
+        self.requests = {}
+        self.latencies = {}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # Skip headers; only GET without a body is supported
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                started = time.perf_counter()
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "bad request"})
+                    break
+                url = urlsplit(target)
+                try:
+                    status, body = await self.route(method, url.path, parse_qs(url.query))
+                except Exception as e:
+                    status, body = 500, {"error": str(e)}
+                await self.respond(writer, status, body)
+                self.record(url.path, time.perf_counter() - started)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, query):
+        if method != "GET":
+            return 405, {"error": "method not allowed"}
+        params = {key: values[0] for key, values in query.items()}
+        if path == "/path":
+            return await self.path(params)
+        if path == "/names":
+            return self.names(params)
+        if path == "/metrics":
+            return 200, self.metrics()
+        return 404, {"error": "not found"}
+
+    async def path(self, params):
+        if "source" not in params or "target" not in params:
+            return 400, {"error": "source and target are required"}
+        source = degrees.resolve_person(params["source"])
+        target = degrees.resolve_person(params["target"])
+        if source is None or target is None:
+            return 404, {"error": "person not found"}
+        try:
+            k = int(params.get("k", 1))
+        except ValueError:
+            return 400, {"error": "k must be an integer"}
+        if k < 1:
+            return 400, {"error": "k must be at least 1"}
+        k = min(k, MAX_PATHS)
+
+        key = (source, target, k)
+        paths = self.cache.get(key)
+        if paths is None:
+            loop = asyncio.get_running_loop()
+            paths = await loop.run_in_executor(self.pool, search_paths, source, target, k)
+            self.cache.put(key, paths)
+        return 200, {
+            "source": source,
+            "target": target,
+            "degrees": len(paths[0]) if paths else None,
+            "paths": paths,
+        }
+
+    def names(self, params):
+        if "q" not in params:
+            return 400, {"error": "q is required"}
+        try:
+            limit = int(params.get("limit", 10))
+        except ValueError:
+            return 400, {"error": "limit must be an integer"}
+        if limit < 1:
+            return 400, {"error": "limit must be at least 1"}
+        limit = min(limit, MAX_MATCHES)
+        index = degrees.get_name_index()
+        if params.get("fuzzy"):
+            matches = [
+                {"name": name, "distance": distance, "person_ids": ids}
+                for distance, name, ids in index.fuzzy(params["q"], limit=limit)
+            ]
+        else:
+            matches = [
+                {"name": name, "person_ids": ids}
+                for name, ids in index.prefix(params["q"], limit)
+            ]
+        return 200, {"matches": matches}
+
+    def record(self, path, elapsed):
+        if path not in ROUTES:
+            path = "other"
+        self.requests[path] = self.requests.get(path, 0) + 1
+        self.latencies.setdefault(path, deque(maxlen=LATENCY_WINDOW)).append(elapsed * 1000)
+
+    def metrics(self):
+        return {
+            "requests": self.requests,
+            "latency_ms": {
+                path: percentiles(list(latencies))
+                for path, latencies in self.latencies.items()
+            },
+            "cache": {
+                "size": len(self.cache.entries),
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+            },
+        }
+
+    async def respond(self, writer, status, body):
+        reasons = {
+            200: "OK", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 500: "Internal Server Error",
+        }
+        payload = json.dumps(body).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {reasons[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+        )
+        await writer.drain()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python server.py [directory] [--host HOST] [--port PORT] [--workers N]"
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="build a K-landmark distance index and answer "
+                             "k=1 queries with A* search")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    server = DegreesServer(args.directory, args.workers, args.cache_size, args.landmarks)
+    print("Data loaded.")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Sequence
+from functools import cached_property
+
+from graph import Graph
+
+# Binary snapshot of a compiled Graph, written next to the CSV files
+SNAPSHOT_NAME = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGRSNAP"
+SNAPSHOT_VERSION = 1
+
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# magic, version, header length
+PREFIX = struct.Struct("<8sII")
+
+ARRAYS = (
+    ("person_offsets", "q"),
+    ("person_movies", "i"),
+    ("movie_offsets", "q"),
+    ("movie_people", "i"),
+)
+STRINGS = (
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years",
+)
+
+
+class StringTable(Sequence):
+    """
+    A string section of a snapshot, split into a list on first use, so
+    processes that only search the CSR arrays never decode it.
+    """
+
+    def __init__(self, data, count):
+        self.data = data
+        self.count = count
+
+    @cached_property
+    def strings(self):
+        return str(self.data, "utf-8").split("\0") if self.count else []
+
+    def __getitem__(self, i):
+        return self.strings[i]
+
+    def __iter__(self):
+        return iter(self.strings)
+
+    def __len__(self):
+        return self.count
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def file_hash(path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(directory, hashes=True):
+    """
+    Describes the CSV files a snapshot was built from: size and mtime
+    for each, plus a content hash if `hashes` is true.
+    """
+    sources = {}
+    for name in SOURCES:
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        sources[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(path) if hashes else None,
+        }
+    return sources
+
+
+def is_fresh(directory, sources):
+    """
+    Checks a stored fingerprint against the CSV files on disk.
+
+    Matching size and mtime is enough. If only the mtime moved
+    (e.g. after a checkout) the contents are hashed and compared, and
+    on a match the new mtime is recorded in `sources`.
+    """
+    try:
+        current = fingerprint(directory, hashes=False)
+    except OSError:
+        return False
+    for name in SOURCES:
+        stored = sources.get(name)
+        if stored is None or stored["size"] != current[name]["size"]:
+            return False
+        if stored["mtime_ns"] != current[name]["mtime_ns"]:
+            if stored["sha256"] != file_hash(os.path.join(directory, name)):
+                return False
+            stored["mtime_ns"] = current[name]["mtime_ns"]
+    return True
+
+
+def write_snapshot(directory, graph, sources=None):
+    """
+    Writes `graph` to the snapshot file in `directory`.
+
+    `sources` is the fingerprint of the CSVs the graph was built from;
+    it is computed now if not given.
+    """
+    if sources is None:
+        sources = fingerprint(directory)
+
+    sections = []
+    for name, typecode in ARRAYS:
+        sections.append((name, typecode, array(typecode, getattr(graph, name)).tobytes()))
+    for name in STRINGS:
+        sections.append((name, "s", "\0".join(getattr(graph, name)).encode("utf-8")))
+
+    # Sections start on 8-byte boundaries so they can be cast in place
+    layout = {}
+    offset = 0
+    for name, typecode, data in sections:
+        layout[name] = [typecode, offset, len(data)]
+        offset += len(data) + (-len(data) % 8)
+
+    header = json.dumps({
+        "person_count": graph.person_count,
+        "movie_count": graph.movie_count,
+        "sources": sources,
+        "rejected": dict(graph.rejected),
+        "sections": layout,
+    }).encode("utf-8")
+    header += b" " * (-(PREFIX.size + len(header)) % 8)
+
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        for name, typecode, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(temporary, path)
+
+
+def read_header(path):
+    """
+    Returns (header, header_length) for a snapshot file.
+    Raises ValueError if the file is not a snapshot of this version.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(PREFIX.size)
+        if len(prefix) < PREFIX.size:
+            raise ValueError("truncated snapshot")
+        magic, version, header_length = PREFIX.unpack(prefix)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("unsupported snapshot")
+        return json.loads(f.read(header_length)), header_length
+
+
+def read_snapshot(path):
+    """
+    Memory-maps a snapshot file and returns (graph, header).
+
+    The CSR arrays are zero-copy views into the mapping, and the string
+    tables are only decoded when first used.
+    Raises ValueError if the file is not a snapshot of this version.
+    """
+    header, header_length = read_header(path)
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    base = PREFIX.size + header_length
+    view = memoryview(mapping)
+    fields = {}
+    for name, (typecode, offset, length) in header["sections"].items():
+        if base + offset + length > len(mapping):
+            raise ValueError("truncated snapshot")
+        data = view[base + offset:base + offset + length]
+        if typecode == "s":
+            count = header["person_count" if name.startswith("person") else "movie_count"]
+            fields[name] = StringTable(data, count)
+        else:
+            fields[name] = data.cast(typecode)
+
+    graph = Graph(**fields)
+    graph.rejected.update(header.get("rejected", {}))
+    # Keep the mapping alive for as long as the graph uses it
+    graph.mapping = mapping
+    return graph, header
+
+
+def load_snapshot(directory):
+    """
+    Returns the Graph stored next to the CSVs in `directory`,
+    or None if there is no snapshot or it is stale.
+
+    If the CSVs were only touched, the snapshot is rewritten with their
+    new mtimes so later loads don't hash them again.
+    """
+    path = snapshot_path(directory)
+    if not os.path.exists(path):
+        return None
+    try:
+        header, _ = read_header(path)
+        sources = header["sources"]
+        mtimes = {name: sources[name]["mtime_ns"] for name in SOURCES if name in sources}
+        if not is_fresh(directory, sources):
+            return None
+        graph, _ = read_snapshot(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    if any(sources[name]["mtime_ns"] != mtime for name, mtime in mtimes.items()):
+        try:
+            write_snapshot(directory, graph, sources)
+        except OSError:
+            pass
+    return graph
@@ -1,5 +1,9 @@
 import itertools
 
+# Parenthesis depth at which compile_sentence moves a subexpression into
+# its own function, well under the nesting CPython's parser accepts
+MAX_NESTING = 50
+
 
 class Sentence():
 
@@ -15,6 +19,33 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def expression(self, index, helpers):
+        """
+        Returns a Python expression string that evaluates the sentence
+        over an int bitmask `m`, where bit `index[name]` holds the truth
+        value of each symbol. Subexpressions nested too deeply are added
+        to `helpers` and called as `h<number>(m)`.
+        """
+        raise Exception("nothing to compile")
+
+    @classmethod
+    def nest(cls, helpers, expression):
+        """
+        Returns the expression, or a call to a new helper evaluating it
+        if it is nested MAX_NESTING parentheses deep.
+        """
+        depth = deepest = 0
+        for c in expression:
+            if c == "(":
+                depth += 1
+                deepest = max(deepest, depth)
+            elif c == ")":
+                depth -= 1
+        if deepest < MAX_NESTING:
+            return expression
+        helpers.append(expression)
+        return f"h{len(helpers) - 1}(m)"
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +99,12 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def expression(self, index, helpers):
+        try:
+            return f"(m & {1 << index[self.name]})"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +129,10 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def expression(self, index, helpers):
+        operand = self.operand.expression(index, helpers)
+        return Sentence.nest(helpers, f"(not {operand})")
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +170,13 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def expression(self, index, helpers):
+        if not self.conjuncts:
+            return "True"
+        return Sentence.nest(helpers, "(" + " and ".join(
+            conjunct.expression(index, helpers) for conjunct in self.conjuncts
+        ) + ")")
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +208,13 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def expression(self, index, helpers):
+        if not self.disjuncts:
+            return "False"
+        return Sentence.nest(helpers, "(" + " or ".join(
+            disjunct.expression(index, helpers) for disjunct in self.disjuncts
+        ) + ")")
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +246,11 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def expression(self, index, helpers):
+        antecedent = self.antecedent.expression(index, helpers)
+        consequent = self.consequent.expression(index, helpers)
+        return Sentence.nest(helpers, f"(not {antecedent} or {consequent})")
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -224,40 +284,38 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def expression(self, index, helpers):
+        # `not` turns both sides into bools, so they can be compared
+        left = self.left.expression(index, helpers)
+        right = self.right.expression(index, helpers)
+        return Sentence.nest(helpers, f"((not {left}) == (not {right}))")
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+def compile_sentence(sentence, index):
+    """
+    Compiles a sentence into a function of one int bitmask, where bit
+    `index[name]` holds the truth value of each symbol.
 
-        # If model has an assignment for each symbol
-        if not symbols:
+    Deeply nested sentences are split into helper functions, since one
+    expression string nested hundreds of levels deep would not parse.
+    """
+    helpers = []
+    expression = sentence.expression(index, helpers)
+    namespace = {}
+    for number, helper in enumerate(helpers):
+        namespace[f"h{number}"] = eval(f"lambda m: {helper}", namespace)
+    return eval(f"lambda m: {expression}", namespace)
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    # Get all symbols in both knowledge and query, each with its own bit
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    # In every model, if knowledge base is true then query must also be true
+    entailed = compile_sentence(Implication(knowledge, query), index)
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Each model is an int whose bits are the symbols' truth values
+    return all(map(entailed, range(1 << len(symbols))))
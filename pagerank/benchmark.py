@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from bisect import bisect
+from itertools import accumulate
+
+import pagerank
+
+# (rótulo, páginas) geradas quando --scales não é informado
+SCALES = (
+    ("100", 100),
+    ("1k", 1000),
+    ("10k", 10000),
+)
+
+# Motores medidos; o de dicionários é O(N²) por iteração, então só roda
+# até DICT_LIMIT páginas
+MODES = ("dict", "numpy")
+DICT_LIMIT = 2000
+
+
+def generate(directory, pages, seed=0, zipf=1.0, dangling=0.1, cycles=None):
+    """
+    Escreve um corpus sintético de `pages` arquivos HTML.
+
+    O número de links de cada página segue uma lei de potência (a maioria
+    tem poucos, algumas têm dezenas) e os destinos são sorteados com
+    popularidade tipo Zipf, então o grau de entrada também é muito
+    desigual, como na web. Uma fração `dangling` das páginas não tem
+    links, e `cycles` ciclos curtos (por padrão, um a cada 100 páginas)
+    são costurados no grafo. Os hrefs variam entre aspas duplas,
+    simples, `./`, fragmentos e links externos.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    weights = list(accumulate(1 / (rank + 1) ** zipf for rank in range(pages)))
+    total = weights[-1]
+    # A popularidade não deve seguir a ordem dos nomes
+    order = list(range(pages))
+    rng.shuffle(order)
+
+    links = [set() for _ in range(pages)]
+    is_dangling = [rng.random() < dangling for _ in range(pages)]
+    for page in range(pages):
+        if is_dangling[page]:
+            continue
+        degree = min(int(rng.paretovariate(1.5)), 50, pages - 1)
+        while len(links[page]) < degree:
+            target = order[bisect(weights, rng.random() * total)]
+            if target != page:
+                links[page].add(target)
+
+    if cycles is None:
+        cycles = pages // 100
+    for _ in range(cycles):
+        members = [page for page in rng.sample(range(pages), min(rng.randint(2, 8), pages))
+                   if not is_dangling[page]]
+        for page, target in zip(members, members[1:] + members[:1]):
+            if page != target:
+                links[page].add(target)
+
+    for page in range(pages):
+        with open(os.path.join(directory, f"{page}.html"), "w", encoding="utf-8") as f:
+            f.write(f"<!DOCTYPE html>\n<html>\n<head><title>{page}</title></head>\n<body>\n")
+            f.write(f"<h1>Page {page}</h1>\n")
+            for target in sorted(links[page]):
+                f.write(f"<p>See <a href={href(rng, target)}>page {target}</a>.</p>\n")
+            if rng.random() < 0.2:
+                f.write('<a href="https://example.com/">external</a> <a href="#top">top</a>\n')
+            f.write("</body>\n</html>\n")
+
+
+def href(rng, target):
+    """Um href para `target.html` em uma das formas aceitas por `crawl`."""
+    choice = rng.random()
+    if choice < 0.7:
+        return f'"{target}.html"'
+    if choice < 0.8:
+        return f"'{target}.html'"
+    if choice < 0.9:
+        return f'"./{target}.html"'
+    return f'"{target}.html#section"'
+
+
+def measure(directory, mode, samples, seed=0):
+    """
+    Lê `directory` e calcula o PageRank por amostragem e por iteração
+    com um motor. Deve rodar em um processo novo para que o pico de
+    memória seja só dele. No motor numpy, a montagem da matriz é medida
+    à parte e não entra nos tempos de amostragem e iteração.
+    """
+    started = time.perf_counter()
+    corpus = pagerank.crawl(directory)
+    crawl_seconds = time.perf_counter() - started
+    links = sum(len(targets) for targets in corpus.values())
+
+    if mode == "numpy":
+        from matrix import LinkMatrix, solve_pagerank
+        from sampler import SurferSampler
+        started = time.perf_counter()
+        matrix = LinkMatrix.from_corpus(corpus)
+        compile_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        sampled = matrix.ranks_dict(
+            SurferSampler(matrix).sample(pagerank.DAMPING, samples, seed=seed)
+        )
+        sample_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        vector, report = solve_pagerank(matrix, pagerank.DAMPING)
+        iterated = matrix.ranks_dict(vector)
+        iterate_seconds = time.perf_counter() - started
+        iterations = report["iterations"]
+    else:
+        # O motor de dicionários usa o corpus direto, sem montar nada
+        compile_seconds = None
+        random.seed(seed)
+        started = time.perf_counter()
+        sampled = pagerank.sample_pagerank(corpus, pagerank.DAMPING, samples)
+        sample_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        iterated = pagerank.iterate_pagerank(corpus, pagerank.DAMPING)
+        iterate_seconds = time.perf_counter() - started
+        # iterate_pagerank não expõe o número de iterações
+        iterations = None
+
+    return {
+        "mode": mode,
+        "links": links,
+        "crawl_seconds": crawl_seconds,
+        "crawl_pages_per_second": len(corpus) / crawl_seconds if crawl_seconds else None,
+        "compile_seconds": compile_seconds,
+        "samples": samples,
+        "sample_seconds": sample_seconds,
+        "iterate_seconds": iterate_seconds,
+        "iterations": iterations,
+        "l1_error": sum(abs(sampled[page] - iterated[page]) for page in corpus),
+        # ru_maxrss é em kilobytes no Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run(workdir, scales, modes, samples, seed):
+    """Gera cada escala e mede cada motor em um subprocesso."""
+    records = []
+    for label, pages in scales:
+        directory = os.path.join(workdir, label)
+        if not os.path.exists(os.path.join(directory, f"{pages - 1}.html")):
+            print(f"Generating {label} ({pages} pages)...", file=sys.stderr)
+            generate(directory, pages, seed)
+        for mode in modes:
+            if mode == "dict" and pages > DICT_LIMIT:
+                print(f"{label:>6} {mode:>6}: skipped (more than {DICT_LIMIT} pages)",
+                      file=sys.stderr)
+                continue
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", mode, directory,
+                 "--samples", str(samples), "--seed", str(seed)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            record = json.loads(output)
+            record.update({"scale": label, "pages": pages})
+            records.append(record)
+            compiled = ("" if record["compile_seconds"] is None
+                        else f"compile {record['compile_seconds']:.3f}s, ")
+            print(f"{label:>6} {mode:>6}: crawl {record['crawl_pages_per_second']:.0f} pages/s, "
+                  f"{compiled}sample {record['sample_seconds']:.3f}s, "
+                  f"iterate {record['iterate_seconds']:.3f}s, "
+                  f"L1 {record['l1_error']:.4f}, "
+                  f"peak RSS {record['peak_rss_kb'] // 1024} MB", file=sys.stderr)
+    return records
+
+
+def compare(records, baseline):
+    """Mostra a variação dos tempos em relação a uma execução anterior."""
+    previous = {(record["scale"], record["mode"]): record for record in baseline}
+    for record in records:
+        before = previous.get((record["scale"], record["mode"]))
+        if before is None:
+            continue
+        changes = ", ".join(
+            f"{key.split('_')[0]} {record[key] / before[key]:.2f}x"
+            for key in ("crawl_seconds", "compile_seconds", "sample_seconds", "iterate_seconds")
+            # Execuções antigas não mediam a montagem da matriz à parte
+            if before.get(key) and record.get(key)
+        )
+        print(f"{record['scale']:>6} {record['mode']:>6}: {changes}")
+
+
+def parse_scale(value):
+    label, pages = value.split(":")
+    return label, int(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python benchmark.py [--workdir DIR] [--scales LABEL:PAGES ...] "
+              "[--output FILE] [--baseline FILE]"
+    )
+    parser.add_argument("--workdir", default="benchmark")
+    parser.add_argument("--scales", nargs="+", type=parse_scale, default=SCALES)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--samples", type=int, default=pagerank.SAMPLES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", help="arquivo --output anterior para comparar")
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "DIRECTORY"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        mode, directory = args.measure
+        print(json.dumps(measure(directory, mode, args.samples, args.seed)))
+        return
+
+    records = run(args.workdir, args.scales, args.modes, args.samples, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(records, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
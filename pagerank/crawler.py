@@ -0,0 +1,165 @@
+import codecs
+import hashlib
+import json
+import os
+from multiprocessing import Pool
+
+from pagerank import CHUNK_SIZE, iter_links
+
+# Versão do formato do cache de links; mudar invalida caches antigos
+CACHE_VERSION = 2
+
+
+def html_files(directory):
+    """Retorne os nomes dos arquivos .html do diretório."""
+    with os.scandir(directory) as entries:
+        return [entry.name for entry in entries
+                if entry.name.endswith(".html") and entry.is_file()]
+
+
+def parse_page(task):
+    """
+    Lê um arquivo e retorna (nome, links, sha256 do conteúdo);
+    roda nos processos do pool.
+    """
+    directory, filename = task
+    digest = hashlib.sha256()
+    with open(os.path.join(directory, filename), "rb") as f:
+        links = set(iter_links(decode_chunks(f, digest)))
+    return filename, links, digest.hexdigest()
+
+
+def decode_chunks(f, digest, size=CHUNK_SIZE):
+    """
+    Gera o conteúdo de um arquivo binário em blocos de texto,
+    atualizando `digest` com os bytes lidos pelo caminho.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        block = f.read(size)
+        digest.update(block)
+        text = decoder.decode(block, final=not block)
+        if text:
+            yield text
+        if not block:
+            return
+
+
+def parse_pages(directory, filenames, workers=None, chunksize=64):
+    """Gera os resultados de `parse_page` para cada arquivo, em paralelo se pedido."""
+    tasks = [(directory, filename) for filename in filenames]
+    if workers == 1 or len(tasks) < 2:
+        yield from map(parse_page, tasks)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(parse_page, tasks, chunksize)
+
+
+def resolve_links(pages):
+    """
+    Passo final de `crawl`: remove autolinks e mantém apenas links para
+    páginas que existem no corpus.
+    """
+    for filename in pages:
+        pages[filename] = {
+            link for link in pages[filename] if link in pages and link != filename
+        }
+    return pages
+
+
+def parallel_crawl(directory, workers=None, chunksize=64):
+    """
+    Mesmo contrato de `crawl`, distribuindo a leitura e a extração de
+    links entre `workers` processos. Os resultados chegam conforme ficam
+    prontos e o dicionário é montado incrementalmente; os links para
+    fora do corpus são descartados numa passada final.
+    """
+    pages = dict()
+    for filename, links, _ in parse_pages(directory, html_files(directory), workers, chunksize):
+        pages[filename] = links
+    return resolve_links(pages)
+
+
+def cache_path(directory):
+    """O cache fica ao lado do diretório do corpus: `corpus.links.json`."""
+    return os.path.normpath(directory) + ".links.json"
+
+
+def read_cache(directory):
+    try:
+        with open(cache_path(directory), encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache["files"]
+
+
+def write_cache(directory, files):
+    path = cache_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f)
+    os.replace(temporary, path)
+
+
+def update_cache(directory, workers=1):
+    """
+    Sincroniza o cache de links com o diretório e retorna
+    (links brutos por página, estatísticas).
+
+    Arquivos com mesmo tamanho e mtime reaproveitam os links do cache;
+    os demais são lidos de novo (em `workers` processos), e o hash diz
+    se o conteúdo realmente mudou. Arquivos apagados saem do cache.
+    """
+    cached = read_cache(directory)
+    files = {}
+    changed = []
+    stats = {"reused": 0, "parsed": 0, "deleted": 0}
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".html") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            entry_cache = cached.get(entry.name)
+            if (entry_cache is not None and entry_cache["size"] == stat.st_size
+                    and entry_cache["mtime_ns"] == stat.st_mtime_ns):
+                files[entry.name] = entry_cache
+                stats["reused"] += 1
+            else:
+                changed.append(entry.name)
+            files.setdefault(entry.name, {
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "sha256": None, "links": [],
+            })
+    stats["deleted"] = len(set(cached) - set(files))
+
+    for filename, links, digest in parse_pages(directory, changed, workers):
+        entry = files[filename]
+        previous = cached.get(filename)
+        if previous is not None and previous["sha256"] == digest:
+            stats["reused"] += 1
+        else:
+            stats["parsed"] += 1
+        entry["sha256"] = digest
+        entry["links"] = sorted(links)
+
+    if changed or stats["deleted"]:
+        try:
+            write_cache(directory, files)
+        except OSError:
+            pass
+
+    pages = {filename: set(entry["links"]) for filename, entry in files.items()}
+    return pages, stats
+
+
+def cached_crawl(directory, workers=1):
+    """
+    Mesmo contrato de `crawl`, lendo de novo apenas os arquivos novos
+    ou modificados desde a última execução.
+    """
+    pages, _ = update_cache(directory, workers)
+    return resolve_links(pages)
@@ -0,0 +1,112 @@
+from collections import deque
+
+import numpy as np
+
+from matrix import LinkMatrix, power_iteration
+
+
+def apply_link_diff(corpus, added=(), removed=(), deleted_pages=()):
+    """
+    Retorne uma cópia do corpus com a diferença de links aplicada.
+
+    `added` e `removed` são pares (página, destino). Páginas novas
+    podem aparecer como origem em `added`; `deleted_pages` saem do
+    corpus junto com todos os links que apontam para elas.
+    """
+    pages = {page: set(links) for page, links in corpus.items()}
+    for page in deleted_pages:
+        pages.pop(page, None)
+    for page, link in removed:
+        if page in pages:
+            pages[page].discard(link)
+    for page, link in added:
+        pages.setdefault(page, set())
+        if link != page:
+            pages[page].add(link)
+    for page in pages:
+        pages[page] = {link for link in pages[page] if link in pages}
+    return pages
+
+
+def push_residuals(matrix, ranks, residual, damping_factor, threshold, max_pushes):
+    """
+    Propaga localmente os resíduos maiores que `threshold`.
+
+    Empurrar a página `u` soma o resíduo ao seu rank e o repassa, com
+    peso `damping_factor / grau`, para as páginas que ela aponta; só a
+    vizinhança do que mudou é visitada. O resíduo de páginas sem links
+    vai para todas igualmente e é acumulado num escalar `uniform`.
+
+    Retorna (número de pushes, resíduo uniforme pendente).
+    """
+    out_indptr, out_indices = matrix.outgoing()
+    n = len(matrix)
+    uniform = 0.0
+    pushes = 0
+
+    queue = deque(np.flatnonzero(np.abs(residual) > threshold).tolist())
+    queued = np.zeros(n, dtype=bool)
+    queued[queue] = True
+    while queue and pushes < max_pushes:
+        page = queue.popleft()
+        queued[page] = False
+        value = residual[page]
+        residual[page] = 0.0
+        ranks[page] += value
+        pushes += 1
+
+        start, end = out_indptr[page], out_indptr[page + 1]
+        if start == end:
+            uniform += damping_factor * value / n
+            continue
+        share = damping_factor * value / (end - start)
+        for target in out_indices[start:end].tolist():
+            residual[target] += share
+            if not queued[target] and abs(residual[target]) > threshold:
+                queued[target] = True
+                queue.append(target)
+    return pushes, uniform
+
+
+def incremental_pagerank(corpus, previous_ranks, damping_factor, tolerance=1e-6):
+    """
+    Recalcule o PageRank de `corpus` partindo de `previous_ranks`
+    (os ranks de uma versão anterior do corpus) em vez da distribuição
+    uniforme.
+
+    Primeiro os resíduos locais causados pela mudança são propagados
+    por push; depois algumas iterações de potência, já perto do ponto
+    fixo, fecham a convergência com norma L1 abaixo de `tolerance`.
+
+    Retorna (ranks, estatísticas).
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    n = len(matrix)
+
+    # Páginas novas começam com 1 / N; o vetor é renormalizado
+    ranks = np.array([previous_ranks.get(page, 1 / n) for page in matrix.pages])
+    ranks /= ranks.sum()
+
+    residual = matrix.step(ranks, damping_factor) - ranks
+    # "Região afetada": resíduos a até três ordens de grandeza do maior;
+    # o resto, espalhado pelo corpus, sai mais barato nas iterações
+    threshold = max(tolerance / n, 1e-3 * np.abs(residual).max(initial=0.0))
+    pushes, uniform = push_residuals(
+        matrix, ranks, residual, damping_factor, threshold, max_pushes=n,
+    )
+    ranks += uniform
+    ranks /= ranks.sum()
+
+    ranks, iterations = power_iteration(matrix, damping_factor, tolerance, ranks)
+    return matrix.ranks_dict(ranks), {"pushes": pushes, "iterations": iterations}
+
+
+def update_pagerank(corpus, previous_ranks, damping_factor,
+                    added=(), removed=(), deleted_pages=(), tolerance=1e-6):
+    """
+    Aplica uma diferença de links ao corpus e atualiza os ranks a partir
+    dos anteriores. Retorna (novo corpus, ranks, estatísticas).
+    """
+    corpus = apply_link_diff(corpus, added, removed, deleted_pages)
+    ranks, stats = incremental_pagerank(corpus, previous_ranks, damping_factor, tolerance)
+    return corpus, ranks, stats
@@ -0,0 +1,190 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import numpy as np
+
+from matrix import LinkMatrix
+
+# Arquivo binário com o grafo de links já compilado (extensão sugerida: .graph)
+GRAPH_MAGIC = b"PRGRAPH\0"
+GRAPH_VERSION = 1
+
+# magic, versão, tamanho do cabeçalho
+PREFIX = struct.Struct("<8sII")
+
+# Seções: nomes das páginas e a CSR de links de entrada de LinkMatrix
+SECTIONS = (
+    ("names", "s"),
+    ("indptr", "<i8"),
+    ("indices", "<i4"),
+)
+
+
+def write_graph(path, matrix):
+    """
+    Grava uma LinkMatrix em `path`.
+
+    O cabeçalho JSON guarda as contagens e a posição de cada seção; as
+    seções começam em múltiplos de 8 bytes para serem lidas sem cópia.
+    Os nomes ficam separados por "\\0".
+    """
+    sections = []
+    for name, dtype in SECTIONS:
+        if dtype == "s":
+            data = "\0".join(matrix.pages).encode("utf-8")
+        else:
+            data = np.ascontiguousarray(getattr(matrix, name), dtype=dtype).tobytes()
+        sections.append((name, dtype, data))
+
+    layout = {}
+    offset = 0
+    for name, dtype, data in sections:
+        layout[name] = [dtype, offset, len(data)]
+        offset += len(data) + (-len(data) % 8)
+
+    header = json.dumps({
+        "pages": len(matrix),
+        "links": len(matrix.indices),
+        "sections": layout,
+    }).encode("utf-8")
+    header += b" " * (-(PREFIX.size + len(header)) % 8)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREFIX.pack(GRAPH_MAGIC, GRAPH_VERSION, len(header)))
+        f.write(header)
+        for name, dtype, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(temporary, path)
+
+
+def read_header(path):
+    """
+    Retorna (cabeçalho, tamanho do cabeçalho) de um arquivo de grafo.
+    Levanta ValueError se o arquivo não for um grafo desta versão.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(PREFIX.size)
+        if len(prefix) < PREFIX.size:
+            raise ValueError("arquivo de grafo truncado")
+        magic, version, header_length = PREFIX.unpack(prefix)
+        if magic != GRAPH_MAGIC or version != GRAPH_VERSION:
+            raise ValueError("formato de grafo não suportado")
+        return json.loads(f.read(header_length)), header_length
+
+
+def is_graph(path):
+    """Diz se `path` é um arquivo no formato de `write_graph`."""
+    try:
+        read_header(path)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def read_sections(path):
+    """
+    Mapeia o arquivo em memória e retorna (cabeçalho, seções): os nomes
+    como lista e os arrays como visões NumPy sobre o mapeamento, sem cópia.
+    """
+    header, header_length = read_header(path)
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    base = PREFIX.size + header_length
+    sections = {}
+    for name, (dtype, offset, length) in header["sections"].items():
+        if base + offset + length > len(mapping):
+            raise ValueError("arquivo de grafo truncado")
+        if dtype == "s":
+            data = mapping[base + offset:base + offset + length]
+            sections[name] = data.decode("utf-8").split("\0") if header["pages"] else []
+        else:
+            sections[name] = np.frombuffer(
+                mapping, dtype=dtype, count=length // np.dtype(dtype).itemsize,
+                offset=base + offset,
+            )
+    return header, sections
+
+
+def read_graph(path):
+    """
+    Carrega um arquivo de grafo como LinkMatrix. A CSR é usada direto do
+    mapeamento; só os graus de saída são recalculados.
+    """
+    header, sections = read_sections(path)
+    out_degree = np.bincount(sections["indices"], minlength=header["pages"])
+    return LinkMatrix(sections["names"], sections["indptr"], sections["indices"],
+                      out_degree.astype(np.float64))
+
+
+def read_edge_list(path):
+    """
+    Lê um arquivo texto com uma aresta "origem destino" por linha
+    (separadas por espaços ou tabulação; linhas vazias e iniciadas por
+    "#" são ignoradas) e retorna uma LinkMatrix. As páginas são numeradas
+    na ordem em que aparecem. Como em `crawl`, links de uma página para
+    ela mesma são descartados.
+    """
+    index = {}
+    sources = array("q")
+    targets = array("q")
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            if len(fields) != 2:
+                raise ValueError(f"{path}:{number}: esperado 'origem destino'")
+            source, target = fields
+            source = index.setdefault(source, len(index))
+            target = index.setdefault(target, len(index))
+            if source != target:
+                sources.append(source)
+                targets.append(target)
+    return LinkMatrix.from_edges(list(index), np.frombuffer(sources, dtype=np.int64),
+                                 np.frombuffer(targets, dtype=np.int64))
+
+
+def write_ranks(path, ranks):
+    """Grava o vetor de ranks, na ordem das páginas do grafo, como .npy."""
+    with open(path, "wb") as f:
+        np.save(f, np.asarray(ranks, dtype=np.float64))
+
+
+def read_ranks(path):
+    """Lê um vetor gravado por `write_ranks`, mapeado em memória."""
+    return np.load(path, mmap_mode="r")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python linkgraph.py (corpus | --edges FILE) output.graph [--workers N]"
+    )
+    parser.add_argument("source", nargs="?", help="diretório de páginas HTML")
+    parser.add_argument("output")
+    parser.add_argument("--edges", help="arquivo texto com uma aresta por linha")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="lê o corpus com N processos (crawler.py)")
+    args = parser.parse_args()
+    if (args.source is None) == (args.edges is None):
+        parser.error("informe um diretório de páginas ou --edges, não os dois")
+
+    if args.edges:
+        matrix = read_edge_list(args.edges)
+    else:
+        from crawler import parallel_crawl
+        matrix = LinkMatrix.from_corpus(parallel_crawl(args.source, args.workers or 1))
+    write_graph(args.output, matrix)
+    print(f"{len(matrix)} pages, {len(matrix.indices)} links written to {args.output}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import time
+from collections import deque
+
+import numpy as np
+
+# Normas aceitas para medir o resíduo entre duas iterações (por linha,
+# quando a diferença é um bloco de vetores)
+NORMS = {
+    "l1": lambda delta: np.abs(delta).sum(axis=-1),
+    "l2": lambda delta: np.sqrt((delta * delta).sum(axis=-1)),
+    "max": lambda delta: np.abs(delta).max(axis=-1, initial=0.0),
+}
+
+# Métodos de extrapolação aceitos por `solve_pagerank`
+EXTRAPOLATIONS = (None, "aitken", "anderson")
+
+
+class LinkMatrix():
+    """
+    Corpus compilado em uma matriz esparsa coluna-estocástica (CSR).
+
+    As páginas viram índices inteiros (posição em `pages`). A linha `i`
+    guarda as páginas que apontam para `i`:
+    `indices[indptr[i]:indptr[i + 1]]`. O peso de cada aresta `j -> i` é
+    `1 / out_degree[j]`, então não precisa ser armazenado.
+    """
+
+    def __init__(self, pages, indptr, indices, out_degree):
+        self.pages = pages
+        self.indptr = indptr
+        self.indices = indices
+        self.out_degree = out_degree
+        self.index = {page: i for i, page in enumerate(pages)}
+        # Páginas sem links de saída e o inverso do grau das demais
+        self.dangling = out_degree == 0
+        self.inverse_degree = np.divide(
+            1.0, out_degree, out=np.zeros(len(pages)), where=~self.dangling
+        )
+        # reduceat só recebe as linhas com links: cada trecho vai até o
+        # início da próxima (ou até o fim), e as linhas vazias ficam zeradas
+        self.nonempty_rows = np.flatnonzero(np.diff(indptr))
+        self.starts = np.asarray(indptr[:-1])[self.nonempty_rows]
+        self._outgoing = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """Compila o dicionário retornado por `crawl`."""
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources = []
+        targets = []
+        for page in pages:
+            for link in corpus[page]:
+                if link in index:
+                    sources.append(index[page])
+                    targets.append(index[link])
+        return cls.from_edges(pages, np.array(sources, dtype=np.int64),
+                              np.array(targets, dtype=np.int64))
+
+    @classmethod
+    def from_edges(cls, pages, sources, targets):
+        """Monta a matriz a partir de arestas `sources[k] -> targets[k]`."""
+        n = len(pages)
+        # Arestas repetidas contam uma vez, como no conjunto de links de `crawl`
+        edges = np.unique(np.asarray(targets, dtype=np.int64) * n + sources)
+        targets, sources = np.divmod(edges, n) if n else (edges, edges)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=indptr[1:])
+        out_degree = np.bincount(sources, minlength=n).astype(np.float64)
+        return cls(pages, indptr, sources.astype(np.int32), out_degree)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def outgoing(self):
+        """
+        Retorna os links de saída em CSR: (out_indptr, out_indices), com os
+        destinos da página `j` em `out_indices[out_indptr[j]:out_indptr[j + 1]]`.
+        """
+        if self._outgoing is None:
+            # Aqui guardamos os links de entrada; basta reordenar pela origem
+            rows = np.repeat(np.arange(len(self.pages), dtype=np.int64), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            out_indptr = np.zeros(len(self.pages) + 1, dtype=np.int64)
+            np.cumsum(self.out_degree.astype(np.int64), out=out_indptr[1:])
+            self._outgoing = (out_indptr, rows[order])
+        return self._outgoing
+
+    def multiply(self, ranks):
+        """
+        Retorna M @ ranks: a soma, para cada página, de rank / grau de
+        saída de todas as páginas que apontam para ela. `ranks` pode ser
+        um vetor ou um bloco com um vetor por linha, multiplicado de uma
+        vez (os índices são percorridos uma só vez para o bloco todo).
+        """
+        result = np.zeros(ranks.shape)
+        if not len(self.indices):
+            return result
+        contributions = np.take(ranks * self.inverse_degree, self.indices, axis=-1)
+        result[..., self.nonempty_rows] = np.add.reduceat(contributions, self.starts, axis=-1)
+        return result
+
+    def step(self, ranks, damping_factor, teleport=None):
+        """
+        Uma iteração do PageRank. A massa das páginas sem links é
+        distribuída igualmente entre todas, como se elas apontassem
+        para todo o corpus.
+
+        Com `teleport` (uma distribuição por linha de `ranks`), os saltos
+        aleatórios seguem essa distribuição em vez da uniforme; a massa
+        das páginas sem links continua uniforme, o que mantém o resultado
+        linear em `teleport`.
+        """
+        n = len(self.pages)
+        dangling_mass = ranks[..., self.dangling].sum(axis=-1, keepdims=True)
+        jump = (1 - damping_factor) / n if teleport is None else (1 - damping_factor) * teleport
+        return jump + damping_factor * (self.multiply(ranks) + dangling_mass / n)
+
+    def ranks_dict(self, ranks):
+        return {page: float(rank) for page, rank in zip(self.pages, ranks)}
+
+
+def power_iteration(matrix, damping_factor, tolerance=1e-6, ranks=None):
+    """
+    Itera a partir de `ranks` (por padrão, a distribuição uniforme) até
+    que a norma L1 da diferença entre duas iterações fique abaixo de
+    `tolerance`.
+
+    Retorna o vetor de ranks (NumPy) e o número de iterações.
+    """
+    ranks, report = solve_pagerank(matrix, damping_factor, tolerance, ranks=ranks,
+                                   max_iterations=None)
+    return ranks, report["iterations"]
+
+
+def solve_pagerank(matrix, damping_factor, tolerance=1e-6, norm="l1",
+                   max_iterations=1000, extrapolation=None, ranks=None,
+                   period=10, memory=5):
+    """
+    Iteração de potência com limite de iterações e diagnóstico.
+
+    Para quando a norma `norm` ("l1", "l2" ou "max") da diferença entre
+    duas iterações fica abaixo de `tolerance`, ou depois de
+    `max_iterations` iterações (None para não limitar).
+
+    `extrapolation` pode acelerar a convergência:
+    - "aitken": a cada `period` iterações, aplica a extrapolação Δ² de
+      Aitken, componente a componente, sobre as três últimas iterações;
+      se ela aumentar o resíduo, é desfeita e não é mais aplicada;
+    - "anderson": aceleração de Anderson com as `memory` últimas
+      diferenças, recalculada a cada iteração.
+
+    Retorna o vetor de ranks e um relatório com o número de iterações,
+    o resíduo de cada iteração, o tempo em segundos e se convergiu.
+    """
+    if extrapolation not in EXTRAPOLATIONS:
+        raise ValueError(f"extrapolação desconhecida: {extrapolation}")
+    distance = NORMS[norm]
+    started = time.perf_counter()
+    n = len(matrix)
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+    residuals = []
+    converged = n == 0
+
+    # Iterações recentes (Aitken) e diferenças recentes (Anderson)
+    iterates = deque([ranks], maxlen=3)
+    residual_changes = deque(maxlen=memory)
+    step_changes = deque(maxlen=memory)
+    previous = None
+    rollback = None
+
+    while not converged and (max_iterations is None or len(residuals) < max_iterations):
+        stepped = matrix.step(ranks, damping_factor)
+        residuals.append(float(distance(stepped - ranks)))
+        if residuals[-1] < tolerance:
+            ranks = stepped
+            converged = True
+        elif extrapolation == "aitken":
+            if rollback is not None and residuals[-1] > rollback[1]:
+                # A extrapolação piorou o resíduo: volta à última iteração
+                # comum e segue sem extrapolar
+                stepped = rollback[0]
+                extrapolation = None
+            rollback = None
+            ranks = stepped
+            iterates.append(ranks)
+            if extrapolation and len(residuals) % period == 0 and len(iterates) == 3:
+                rollback = (ranks, residuals[-1])
+                ranks = aitken(*iterates)
+                iterates.clear()
+                iterates.append(ranks)
+        elif extrapolation == "anderson":
+            residual = stepped - ranks
+            if previous is not None:
+                residual_changes.append(residual - previous[0])
+                step_changes.append(stepped - previous[1])
+            previous = (residual, stepped)
+            ranks = anderson(residual, stepped, residual_changes, step_changes)
+        else:
+            ranks = stepped
+
+    return ranks, {
+        "iterations": len(residuals),
+        "residuals": residuals,
+        "seconds": time.perf_counter() - started,
+        "converged": converged,
+    }
+
+
+def aitken(first, second, third):
+    """
+    Extrapolação Δ² de Aitken de três iterações consecutivas. Componentes
+    com segunda diferença quase nula ficam com a última iteração.
+    """
+    delta = third - second
+    curvature = delta - (second - first)
+    safe = np.abs(curvature) > 1e-15
+    extrapolated = third.copy()
+    extrapolated[safe] -= delta[safe] ** 2 / curvature[safe]
+    return normalize(extrapolated, third)
+
+
+def anderson(residual, stepped, residual_changes, step_changes):
+    """
+    Um passo da aceleração de Anderson: combina as iterações recentes
+    com os pesos que minimizam o resíduo por mínimos quadrados.
+    """
+    if not residual_changes:
+        return stepped
+    weights = np.linalg.lstsq(
+        np.column_stack(residual_changes), residual, rcond=None
+    )[0]
+    return normalize(stepped - np.column_stack(step_changes) @ weights, stepped)
+
+
+def normalize(ranks, fallback):
+    """
+    Remove componentes negativos e renormaliza para somar 1; se não
+    sobrar massa, devolve `fallback`.
+    """
+    ranks = np.maximum(ranks, 0.0)
+    total = ranks.sum()
+    return ranks / total if total > 0 else fallback
+
+
+def matrix_pagerank(corpus, damping_factor, tolerance=1e-6):
+    """
+    Mesmo contrato de `iterate_pagerank`, usando a matriz esparsa
+    compilada e multiplicações matriz-vetor.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    ranks, _ = power_iteration(matrix, damping_factor, tolerance)
+    return matrix.ranks_dict(ranks)
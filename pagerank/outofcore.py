@@ -0,0 +1,128 @@
+import mmap
+import time
+
+import numpy as np
+
+from linkgraph import PREFIX, read_header
+from matrix import NORMS
+
+# Links lidos do arquivo por bloco (int32: 16 MiB por bloco)
+BLOCK_LINKS = 1 << 22
+
+
+class StreamedGraph():
+    """
+    Grafo gravado por `linkgraph.write_graph`, lido em blocos.
+
+    Só `indptr` (uma entrada por página) e os graus de saída ficam em
+    memória; os índices dos links são lidos do mapeamento um bloco de
+    páginas de destino por vez e devolvidos ao sistema logo depois, então
+    a memória residente cresce com o número de páginas, não de links.
+    """
+
+    def __init__(self, path, block_links=BLOCK_LINKS):
+        header, header_length = read_header(path)
+        with open(path, "rb") as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        base = PREFIX.size + header_length
+        sections = header["sections"]
+
+        self.pages = header["pages"]
+        self.links = header["links"]
+        _, offset, length = sections["names"]
+        self.names = (self.mapping[base + offset:base + offset + length]
+                      .decode("utf-8").split("\0") if self.pages else [])
+        _, offset, _ = sections["indptr"]
+        self.indptr = np.frombuffer(self.mapping, dtype="<i8", count=self.pages + 1,
+                                    offset=base + offset).copy()
+        _, self.indices_offset, _ = sections["indices"]
+        self.indices_offset += base
+
+        # Blocos de páginas de destino com até `block_links` links cada
+        # (uma página com mais links que isso forma um bloco sozinha)
+        cuts = np.searchsorted(self.indptr, np.arange(0, self.links, block_links), side="right") - 1
+        self.blocks = np.unique(np.concatenate([cuts, [self.pages]]))
+
+        out_degree = np.zeros(self.pages, dtype=np.int64)
+        for _, _, indices in self.read_blocks():
+            out_degree += np.bincount(indices, minlength=self.pages)
+        self.dangling = out_degree == 0
+        self.inverse_degree = np.divide(
+            1.0, out_degree, out=np.zeros(self.pages), where=~self.dangling
+        )
+
+    def __len__(self):
+        return self.pages
+
+    def read_blocks(self):
+        """
+        Gera (primeira página, última página + 1, índices) de cada bloco,
+        liberando as páginas do mapeamento já consumidas.
+        """
+        for first, last in zip(self.blocks[:-1], self.blocks[1:]):
+            start, end = self.indptr[first], self.indptr[last]
+            indices = np.frombuffer(self.mapping, dtype="<i4", count=end - start,
+                                    offset=self.indices_offset + 4 * start)
+            yield first, last, indices
+            self.release(self.indices_offset + 4 * start, 4 * (end - start))
+
+    def release(self, offset, length):
+        """Avisa o sistema que um trecho do arquivo não será usado tão cedo."""
+        if not hasattr(mmap, "MADV_DONTNEED") or length <= 0:
+            return
+        aligned = offset - offset % mmap.PAGESIZE
+        self.mapping.madvise(mmap.MADV_DONTNEED, aligned, offset + length - aligned)
+
+    def multiply(self, ranks):
+        """M @ ranks, lendo os links do arquivo bloco a bloco."""
+        weighted = ranks * self.inverse_degree
+        result = np.zeros(self.pages)
+        for first, last, indices in self.read_blocks():
+            if not len(indices):
+                continue
+            offsets = self.indptr[first:last + 1] - self.indptr[first]
+            # Como em LinkMatrix.multiply, só as linhas com links entram no reduceat
+            rows = np.flatnonzero(np.diff(offsets))
+            result[first + rows] = np.add.reduceat(weighted[indices], offsets[rows])
+        return result
+
+    def step(self, ranks, damping_factor):
+        """Uma iteração do PageRank, como `LinkMatrix.step`."""
+        n = self.pages
+        dangling_mass = ranks[self.dangling].sum()
+        return (
+            (1 - damping_factor) / n
+            + damping_factor * (self.multiply(ranks) + dangling_mass / n)
+        )
+
+    def ranks_dict(self, ranks):
+        return {page: float(rank) for page, rank in zip(self.names, ranks)}
+
+
+def streaming_pagerank(path, damping_factor, tolerance=1e-6, norm="l1",
+                       max_iterations=1000, block_links=BLOCK_LINKS):
+    """
+    PageRank de um arquivo de grafo maior que a memória: cada iteração
+    percorre os links do arquivo em blocos e só os vetores de ranks
+    (float64, um por página) ficam residentes.
+
+    Retorna (grafo, ranks, relatório), com o relatório no formato de
+    `solve_pagerank`.
+    """
+    started = time.perf_counter()
+    graph = StreamedGraph(path, block_links)
+    distance = NORMS[norm]
+    ranks = np.full(len(graph), 1 / len(graph)) if len(graph) else np.zeros(0)
+    residuals = []
+    converged = not len(graph)
+    while not converged and len(residuals) < max_iterations:
+        stepped = graph.step(ranks, damping_factor)
+        residuals.append(float(distance(stepped - ranks)))
+        converged = residuals[-1] < tolerance
+        ranks = stepped
+    return graph, ranks, {
+        "iterations": len(residuals),
+        "residuals": residuals,
+        "seconds": time.perf_counter() - started,
+        "converged": converged,
+    }
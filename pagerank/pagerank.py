@@ -1,24 +1,129 @@
+import argparse
+import html
 import os
+import posixpath
 import random
 import re
-import sys
+from urllib.parse import urlsplit
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Tamanho dos blocos lidos de cada arquivo HTML
+CHUNK_SIZE = 1 << 16
+
+# Tags <a ...> completas e seu atributo href, com aspas duplas, simples ou sem aspas
+ANCHOR = re.compile(r"<a\s[^>]*>", re.IGNORECASE)
+HREF = re.compile(r"""\shref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+
+# Maior tag incompleta guardada entre dois blocos
+MAX_TAG = 1 << 16
+
+# Hrefs que já são um nome de arquivo e dispensam normalização
+PLAIN = re.compile(r"[^&#?:/\s.][^&#?:/\s]*")
+
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
-    print(f"PageRank Results from Sampling (n = {SAMPLES})")
-    for page in sorted(ranks):
-        print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    parser = argparse.ArgumentParser(
+        usage="python pagerank.py corpus [--engine dict|numpy] [--workers N] [--cache] "
+              "[--tolerance T] [--norm l1|l2|max] [--max-iterations N] "
+              "[--extrapolation aitken|anderson] [--diagnostics] [--ranks-output FILE] "
+              "[--out-of-core]"
+    )
+    parser.add_argument("corpus", help="diretório de páginas HTML ou arquivo .graph")
+    parser.add_argument("--engine", choices=("dict", "numpy"), default="dict",
+                        help="numpy usa a matriz esparsa de matrix.py (requer numpy)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="lê o corpus com N processos (crawler.py); com a engine "
+                             "numpy, também divide cada iteração entre eles (parallel.py)")
+    parser.add_argument("--cache", action="store_true",
+                        help="reaproveita os links de arquivos não modificados")
+    # Opções da iteração com a engine numpy
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--norm", choices=("l1", "l2", "max"), default="l1")
+    parser.add_argument("--max-iterations", type=int, default=1000)
+    parser.add_argument("--extrapolation", choices=("aitken", "anderson"))
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="mostra o resíduo de cada iteração e o tempo total")
+    parser.add_argument("--ranks-output",
+                        help="grava os ranks da iteração como array .npy (ordem do grafo)")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="lê os links de um arquivo .graph em blocos a cada iteração, "
+                             "sem a amostragem")
+    args = parser.parse_args()
+    # Um arquivo (e não um diretório) é um grafo gravado por linkgraph.py
+    graph_input = os.path.isfile(args.corpus)
+    if graph_input:
+        args.engine = "numpy"
+    if args.engine != "numpy" and (args.extrapolation or args.diagnostics or args.ranks_output):
+        parser.error("--extrapolation, --diagnostics e --ranks-output requerem --engine numpy")
+    if args.out_of_core and (not graph_input or args.extrapolation):
+        parser.error("--out-of-core requer um arquivo .graph e não aceita --extrapolation")
+    if args.engine == "numpy" and args.workers and (args.out_of_core or args.extrapolation):
+        parser.error("--workers não pode ser combinado com --out-of-core ou --extrapolation")
+
+    if graph_input:
+        corpus = None
+    elif args.cache:
+        from crawler import cached_crawl
+        corpus = cached_crawl(args.corpus, args.workers or 1)
+    elif args.workers:
+        from crawler import parallel_crawl
+        corpus = parallel_crawl(args.corpus, args.workers)
+    else:
+        corpus = crawl(args.corpus)
+    if args.engine == "numpy":
+        # Importados aqui para que o modo padrão não dependa do numpy
+        from matrix import LinkMatrix, solve_pagerank
+        from sampler import SurferSampler
+        if args.out_of_core:
+            # O amostrador precisaria do grafo inteiro em memória
+            ranks = None
+        else:
+            if graph_input:
+                from linkgraph import read_graph
+                matrix = read_graph(args.corpus)
+            else:
+                matrix = LinkMatrix.from_corpus(corpus)
+            ranks = matrix.ranks_dict(SurferSampler(matrix).sample(DAMPING, SAMPLES))
+    else:
+        ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
+    if ranks is not None:
+        print(f"PageRank Results from Sampling (n = {SAMPLES})")
+        for page in sorted(ranks):
+            print(f"  {page}: {ranks[page]:.4f}")
+    if args.engine == "numpy":
+        if args.out_of_core:
+            from outofcore import streaming_pagerank
+            matrix, vector, report = streaming_pagerank(
+                args.corpus, DAMPING, args.tolerance, args.norm, args.max_iterations,
+            )
+        elif args.workers:
+            from parallel import ParallelPageRank
+            with ParallelPageRank(matrix, args.workers) as solver:
+                vector, report = solver.solve(
+                    DAMPING, args.tolerance, args.norm, args.max_iterations,
+                )
+        else:
+            vector, report = solve_pagerank(
+                matrix, DAMPING, args.tolerance, args.norm, args.max_iterations,
+                args.extrapolation,
+            )
+        ranks = matrix.ranks_dict(vector)
+        if args.ranks_output:
+            from linkgraph import write_ranks
+            write_ranks(args.ranks_output, vector)
+    else:
+        ranks = iterate_pagerank(corpus, DAMPING)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
+    if args.diagnostics:
+        status = "converged" if report["converged"] else "did not converge"
+        print(f"Iterations: {report['iterations']} ({status}) "
+              f"in {report['seconds'] * 1000:.1f} ms")
+        for iteration, residual in enumerate(report["residuals"], 1):
+            print(f"  {iteration}: {args.norm} residual {residual:.3e}")
 
 
 def crawl(directory):
@@ -34,9 +139,7 @@ def crawl(directory):
         if not filename.endswith(".html"):
             continue
         with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+            pages[filename] = set(iter_links(read_chunks(f))) - {filename}
 
     # Incluir apenas links para outras páginas no corpus
     for filename in pages:
@@ -45,6 +148,65 @@ def crawl(directory):
     return pages
 
 
+def read_chunks(f, size=CHUNK_SIZE):
+    """Gere o conteúdo de um arquivo em blocos de até `size` caracteres."""
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_links(chunks):
+    """
+    Gere os links `<a href=...>` normalizados à medida que os blocos de
+    HTML chegam. Só uma tag incompleta no fim de cada bloco é guardada
+    para o próximo, então a memória por arquivo fica limitada.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        end = 0
+        for match in ANCHOR.finditer(buffer):
+            end = match.end()
+            href = HREF.search(match.group())
+            if href:
+                link = normalize_link(next(group for group in href.groups() if group is not None))
+                if link:
+                    yield link
+        # Guarda apenas um "<" ainda sem ">" no fim do bloco
+        start = buffer.rfind("<", end)
+        if start != -1 and buffer.find(">", start) == -1 and len(buffer) - start <= MAX_TAG:
+            buffer = buffer[start:]
+        else:
+            buffer = ""
+
+
+def normalize_link(href):
+    """
+    Normalize um href para o nome de arquivo no corpus: remove fragmento
+    e consulta e resolve `./` e `../`. Retorna None para links que
+    apontam só para a própria página (ex.: "#topo").
+    """
+    if PLAIN.fullmatch(href):
+        return href
+    href = html.unescape(href).strip()
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc:
+        # Links externos nunca estão no corpus
+        return href
+    if not parts.path:
+        return None
+    return posixpath.normpath(parts.path.lstrip("/"))
+
+
+def extract_links(contents):
+    """
+    Retorne o conjunto de links normalizados de um documento HTML inteiro.
+    """
+    return set(iter_links([contents]))
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Retornar uma distribuição de probabilidade sobre qual página visitar em seguida,
@@ -70,6 +232,13 @@ def transition_model(corpus, page, damping_factor):
         # probabilidade de um surfista aleatório pular para qualquer página do corpus.
         transition_probability[p] = (1 - damping_factor) / num_pages
 
+    # Uma página sem links é tratada como se apontasse para todas as páginas
+    # do corpus (inclusive ela mesma)
+    if num_links == 0:
+        for p in corpus:
+            transition_probability[p] += damping_factor / num_pages
+        return transition_probability
+
     # Itera em cada página vinculada à página atual
     for linked_page in corpus[page]:
         # Adiciona ao valor da probabilidade de transição da página vinculada o fator de amortecimento
@@ -137,6 +306,10 @@ def iterate_pagerank(corpus, damping_factor):
 
             # Itera em cada página vinculada à página atual
             for linked_page in corpus:
+                # Uma página sem links distribui sua classificação entre todas as páginas
+                if not corpus[linked_page]:
+                    rank += damping_factor * ranks[linked_page] / len(corpus)
+                    continue
                 # Se a página atual está vinculada à página vinculada, adiciona ao valor da classificação da página atual
                 # o produto do fator de amortecimento e da classificação da página vinculada, dividido pelo número total de páginas vinculadas
                 if page in corpus[linked_page]:
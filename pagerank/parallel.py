@@ -0,0 +1,173 @@
+import math
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from matrix import LinkMatrix
+
+# Resíduo parcial de um bloco e como juntar os parciais de todos os blocos
+REDUCTIONS = {
+    "l1": (lambda delta: float(np.abs(delta).sum()), sum),
+    "l2": (lambda delta: float((delta * delta).sum()), lambda parts: math.sqrt(sum(parts))),
+    "max": (lambda delta: float(np.abs(delta).max(initial=0.0)), max),
+}
+
+# Blocos de páginas de destino por processo, para equilibrar a carga
+BLOCKS_PER_WORKER = 4
+
+# Arrays compartilhados de cada processo do pool (ver `attach`)
+shared = {}
+
+
+def attach(specs):
+    """
+    Inicializador do pool: abre os blocos de memória compartilhada
+    descritos em `specs` ({nome: (bloco, dtype, forma)}) como arrays.
+    """
+    for name, (block, dtype, shape) in specs.items():
+        memory = shared_memory.SharedMemory(name=block)
+        shared[name] = (memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+
+
+def step_block(task):
+    """
+    Calcula os novos ranks das páginas de um bloco a partir do vetor
+    `current` e os grava no outro vetor. Retorna o resíduo parcial do
+    bloco e a massa das páginas sem links dele, para a redução.
+    """
+    block, current, damping_factor, dangling_mass, norm = task
+    arrays = {name: array for name, (_, array) in shared.items()}
+    first, last = arrays["blocks"][block], arrays["blocks"][block + 1]
+    indptr = arrays["indptr"]
+    indices = arrays["indices"][indptr[first]:indptr[last]]
+    offsets = indptr[first:last + 1] - indptr[first]
+    n = len(indptr) - 1
+
+    sums = np.zeros(last - first)
+    if len(indices):
+        rows = np.flatnonzero(np.diff(offsets))
+        sums[rows] = np.add.reduceat(arrays["weighted"][current][indices], offsets[rows])
+    new = (1 - damping_factor) / n + damping_factor * (sums + dangling_mass / n)
+
+    following = 1 - current
+    arrays["ranks"][following][first:last] = new
+    arrays["weighted"][following][first:last] = new * arrays["inverse_degree"][first:last]
+    partial, _ = REDUCTIONS[norm]
+    return (partial(new - arrays["ranks"][current][first:last]),
+            float(new[arrays["dangling"][first:last]].sum()))
+
+
+class ParallelPageRank():
+    """
+    Iteração de potência dividida entre processos.
+
+    A CSR de LinkMatrix, os graus e dois pares de vetores (ranks e
+    ranks / grau, alternados a cada iteração) ficam em memória
+    compartilhada. As páginas de destino são divididas em blocos com
+    quantidades parecidas de links; cada processo calcula os novos ranks
+    dos seus blocos e devolve o resíduo e a massa sem links parciais,
+    que o processo principal soma para decidir a convergência.
+    """
+
+    def __init__(self, matrix, workers=None):
+        # Como Pool, usa um processo por CPU quando `workers` não é dado
+        workers = workers or os.cpu_count() or 1
+        self.matrix = matrix
+        self.workers = workers
+        self.memory = []
+        n = len(matrix)
+        blocks_count = workers * BLOCKS_PER_WORKER
+        links = len(matrix.indices)
+        cuts = np.searchsorted(matrix.indptr, np.linspace(0, links, blocks_count + 1)[1:-1],
+                               side="right") - 1
+        # Todo bloco é escrito a cada iteração, então os blocos cobrem
+        # todas as páginas, inclusive as primeiras sem links de entrada
+        blocks = np.unique(np.concatenate([[0], cuts, [n]])).astype(np.int64)
+
+        self.arrays = {}
+        specs = {}
+        for name, value in (
+            ("blocks", blocks),
+            ("indptr", matrix.indptr),
+            ("indices", matrix.indices),
+            ("inverse_degree", matrix.inverse_degree),
+            ("dangling", matrix.dangling),
+            ("ranks", np.zeros((2, n))),
+            ("weighted", np.zeros((2, n))),
+        ):
+            value = np.asarray(value)
+            memory = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+            self.memory.append(memory)
+            array = np.ndarray(value.shape, dtype=value.dtype, buffer=memory.buf)
+            array[...] = value
+            self.arrays[name] = array
+            specs[name] = (memory.name, value.dtype.str, value.shape)
+        self.block_count = len(blocks) - 1
+        self.pool = Pool(workers, initializer=attach, initargs=(specs,))
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def solve(self, damping_factor, tolerance=1e-6, norm="l1", max_iterations=1000):
+        """
+        Itera até a norma `norm` da diferença entre duas iterações ficar
+        abaixo de `tolerance`. Retorna (ranks, relatório), como
+        `solve_pagerank`.
+        """
+        started = time.perf_counter()
+        n = len(self)
+        _, combine = REDUCTIONS[norm]
+        ranks, weighted = self.arrays["ranks"], self.arrays["weighted"]
+        current = 0
+        if n:
+            ranks[current] = 1 / n
+            weighted[current] = ranks[current] * self.arrays["inverse_degree"]
+        dangling_mass = float(ranks[current][self.arrays["dangling"]].sum())
+
+        residuals = []
+        converged = n == 0
+        while not converged and len(residuals) < max_iterations:
+            results = self.pool.map(step_block, [
+                (block, current, damping_factor, dangling_mass, norm)
+                for block in range(self.block_count)
+            ])
+            residuals.append(combine(residual for residual, _ in results))
+            dangling_mass = sum(mass for _, mass in results)
+            current = 1 - current
+            converged = residuals[-1] < tolerance
+
+        return ranks[current].copy(), {
+            "iterations": len(residuals),
+            "residuals": residuals,
+            "seconds": time.perf_counter() - started,
+            "converged": converged,
+        }
+
+    def close(self):
+        """Encerra os processos e libera a memória compartilhada."""
+        self.pool.close()
+        self.pool.join()
+        self.arrays.clear()
+        for memory in self.memory:
+            memory.close()
+            memory.unlink()
+        self.memory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parallel_pagerank(corpus, damping_factor, workers=None, tolerance=1e-6):
+    """
+    Mesmo contrato de `iterate_pagerank`, com cada iteração dividida
+    entre `workers` processos.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    with ParallelPageRank(matrix, workers) as solver:
+        ranks, _ = solver.solve(damping_factor, tolerance)
+    return matrix.ranks_dict(ranks)
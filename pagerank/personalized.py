@@ -0,0 +1,91 @@
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from matrix import NORMS, LinkMatrix
+
+
+def teleport_matrix(matrix, preferences):
+    """
+    Monta o bloco de distribuições de salto, uma linha (com uma entrada
+    por página) para cada preferência.
+
+    Cada preferência é um dicionário {página: peso} (um usuário) ou uma
+    coleção de páginas (um tópico, com peso igual para todas). Os pesos
+    de cada linha são normalizados para somar 1.
+    """
+    teleport = np.zeros((len(preferences), len(matrix)))
+    for row, preference in enumerate(preferences):
+        if not isinstance(preference, Mapping):
+            preference = dict.fromkeys(preference, 1.0)
+        for page, weight in preference.items():
+            if page not in matrix.index:
+                raise ValueError(f"página fora do corpus: {page}")
+            if weight < 0:
+                raise ValueError(f"peso negativo para {page}: {weight}")
+            teleport[row, matrix.index[page]] += weight
+        total = teleport[row].sum()
+        if total <= 0:
+            raise ValueError(f"preferência {row} não tem peso positivo")
+        teleport[row] /= total
+    return teleport
+
+
+def solve_personalized(matrix, teleport, damping_factor, tolerance=1e-6,
+                       norm="l1", max_iterations=1000):
+    """
+    Resolve o PageRank para todas as linhas de `teleport` juntas: cada
+    iteração é uma única multiplicação esparsa pelo bloco inteiro, então
+    os índices da matriz são percorridos uma vez para todos os vetores.
+    Vetores que convergem saem do bloco.
+
+    Retorna o bloco de ranks (uma linha por vetor) e um relatório com as
+    iterações de cada vetor, o tempo em segundos e se todos convergiram.
+    """
+    distance = NORMS[norm]
+    started = time.perf_counter()
+    ranks = teleport.copy()
+    iterations = np.zeros(len(teleport), dtype=np.int64)
+    active = np.arange(len(teleport))
+
+    while len(active) and iterations[active[0]] < max_iterations:
+        current = ranks[active]
+        stepped = matrix.step(current, damping_factor, teleport[active])
+        residuals = distance(stepped - current)
+        ranks[active] = stepped
+        iterations[active] += 1
+        active = active[residuals >= tolerance]
+
+    return ranks, {
+        "iterations": iterations.tolist(),
+        "seconds": time.perf_counter() - started,
+        "converged": not len(active),
+    }
+
+
+def combine(ranks, weights):
+    """
+    Ranks de uma mistura de preferências a partir dos ranks já resolvidos
+    para cada uma: como o PageRank é linear na distribuição de salto, a
+    mistura com pesos `weights` (uma linha por usuário, uma coluna por
+    linha de `ranks`) não precisa de novas iterações.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    weights = weights / weights.sum(axis=-1, keepdims=True)
+    return weights @ ranks
+
+
+def personalized_pagerank(corpus, preferences, damping_factor, tolerance=1e-6):
+    """
+    PageRank personalizado para vários usuários ou tópicos de uma vez.
+
+    `preferences` mapeia um nome para uma preferência (ver
+    `teleport_matrix`). Retorna um dicionário nome -> ranks, no mesmo
+    formato de `iterate_pagerank`.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    names = list(preferences)
+    teleport = teleport_matrix(matrix, [preferences[name] for name in names])
+    ranks, _ = solve_personalized(matrix, teleport, damping_factor, tolerance)
+    return {name: matrix.ranks_dict(ranks[row]) for row, name in enumerate(names)}
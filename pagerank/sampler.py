@@ -0,0 +1,74 @@
+import numpy as np
+
+from matrix import LinkMatrix
+
+
+class SurferSampler():
+    """
+    Amostrador do modelo do surfista aleatório sobre uma LinkMatrix.
+
+    Os links de saída de cada página ficam em arrays CSR
+    (`out_indptr`, `out_indices`), então cada passo de cada surfista
+    custa O(1): escolher um índice dentro do intervalo da página atual.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.out_indptr, self.out_indices = matrix.outgoing()
+        self.out_degree = matrix.out_degree.astype(np.int64)
+
+    def sample(self, damping_factor, n, surfers=10000, seed=None, burn_in=None):
+        """
+        Simula `surfers` surfistas independentes em paralelo até somar
+        `n` amostras e retorna a fração de visitas a cada página.
+
+        Cada surfista começa numa página aleatória. A cada passo, com
+        probabilidade `damping_factor` segue um link da página atual;
+        caso contrário (ou se a página não tem links) pula para
+        qualquer página do corpus.
+
+        As visitas só contam depois de `burn_in` passos, para que os
+        surfistas esqueçam a página inicial; por padrão, passos
+        suficientes para que o peso dela caia abaixo de 1e-3.
+        """
+        rng = np.random.default_rng(seed)
+        pages = len(self.matrix)
+        surfers = max(1, min(surfers, n))
+        positions = rng.integers(pages, size=surfers)
+        visits = np.zeros(pages, dtype=np.int64)
+
+        if burn_in is None:
+            burn_in = int(np.ceil(np.log(1e-3) / np.log(damping_factor))) if 0 < damping_factor < 1 else 0
+        for _ in range(burn_in):
+            positions = self.move(rng, positions, damping_factor)
+
+        remaining = n
+        while remaining > 0:
+            positions = self.move(rng, positions, damping_factor)
+            counted = positions[:remaining] if remaining < surfers else positions
+            visits += np.bincount(counted, minlength=pages)
+            remaining -= len(counted)
+
+        return visits / n
+
+    def move(self, rng, positions, damping_factor):
+        """Um passo de todos os surfistas; retorna as novas posições."""
+        surfers = len(positions)
+        degree = self.out_degree[positions]
+        follow = (rng.random(surfers) < damping_factor) & (degree > 0)
+        # Índice do link escolhido dentro do intervalo da página atual
+        choice = (rng.random(surfers) * degree).astype(np.int64)
+        linked = self.out_indices[
+            np.minimum(self.out_indptr[positions] + choice, len(self.out_indices) - 1)
+        ] if len(self.out_indices) else positions
+        return np.where(follow, linked, rng.integers(len(self.matrix), size=surfers))
+
+
+def vector_sample_pagerank(corpus, damping_factor, n, surfers=10000, seed=None):
+    """
+    Mesmo contrato de `sample_pagerank`, com muitos surfistas simulados
+    em paralelo como arrays NumPy e um gerador com semente.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    ranks = SurferSampler(matrix).sample(damping_factor, n, surfers, seed)
+    return matrix.ranks_dict(ranks)
@@ -0,0 +1,52 @@
+import numpy as np
+
+from matrix import LinkMatrix, matrix_pagerank
+
+
+def dense_pagerank(corpus, damping_factor, tolerance=1e-12):
+    """Iteração de potência com a matriz densa, como referência."""
+    pages = sorted(corpus)
+    n = len(pages)
+    transition = np.zeros((n, n))
+    for j, page in enumerate(pages):
+        links = [pages.index(link) for link in corpus[page] if link in corpus]
+        for i in links or range(n):
+            transition[i, j] = 1 / (len(links) or n)
+    ranks = np.full(n, 1 / n)
+    while True:
+        new_ranks = (1 - damping_factor) / n + damping_factor * transition @ ranks
+        if np.abs(new_ranks - ranks).sum() < tolerance:
+            return dict(zip(pages, new_ranks))
+        ranks = new_ranks
+
+
+def assert_close(ranks, expected):
+    assert ranks.keys() == expected.keys()
+    for page in expected:
+        assert abs(ranks[page] - expected[page]) < 1e-6, page
+
+
+def test_trailing_pages_without_inbound_links():
+    # "c" e "d" vêm por último e ninguém aponta para elas
+    corpus = {"a": {"b"}, "b": {"a"}, "c": {"b"}, "d": {"b"}}
+    ranks = matrix_pagerank(corpus, 0.85, tolerance=1e-12)
+    assert_close(ranks, dense_pagerank(corpus, 0.85))
+    assert abs(sum(ranks.values()) - 1) < 1e-9
+
+
+def test_random_corpora_match_dense():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        n = int(rng.integers(1, 12))
+        pages = [f"{i}.html" for i in range(n)]
+        corpus = {
+            page: {pages[j] for j in rng.integers(0, n, rng.integers(0, 4)) if pages[j] != page}
+            for page in pages
+        }
+        assert_close(matrix_pagerank(corpus, 0.85, tolerance=1e-12),
+                     dense_pagerank(corpus, 0.85))
+
+
+def test_multiply_without_links():
+    matrix = LinkMatrix.from_corpus({"a": set(), "b": set()})
+    assert np.array_equal(matrix.multiply(np.ones(2)), np.zeros(2))